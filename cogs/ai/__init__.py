@@ -0,0 +1 @@
+# This file makes the ai directory a package.
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, collapse whitespace and drop trailing punctuation so trivially different prompts match."""
+    return " ".join(prompt.casefold().split()).rstrip("?!.")
+
+
+class ResponseCache:
+    """
+    A bounded LRU cache of AI completions with a TTL and an optional on-disk tier.
+
+    The memory tier holds at most `max_entries` answers and evicts the least recently used one
+    when full. If `directory` is set, answers are also written there as one small JSON file per
+    key, so they survive restarts. That tier is capped at `max_disk_entries` files.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 6 * 60 * 60,
+        directory: Path | None = None,
+        max_disk_entries: int = 2048,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(prompt: str, model: str, personality: str | None = None) -> str:
+        """Build a cache key from the normalized prompt, the model and the personality."""
+        raw = json.dumps([normalize_prompt(prompt), model, personality])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def get(self, key: str) -> str | None:
+        """Return the cached answer for `key`, or None if there is no fresh entry."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            created, content = entry
+            if now - created < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return content
+            del self._entries[key]
+
+        if self.directory:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._remember(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry[1]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, content: str) -> None:
+        """Store `content` under `key` in memory and, if enabled, on disk."""
+        entry = (time.time(), content)
+        self._remember(key, entry)
+        if self.directory:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    def _remember(self, key: str, entry: tuple[float, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> tuple[float, str] | None:
+        path = self.directory / f"{key}.json"
+        try:
+            data = json.loads(path.read_text("utf-8"))
+            path.touch()  # The disk tier evicts by modification time, so a hit counts as a use.
+            return data["created"], data["content"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, entry: tuple[float, str]) -> None:
+        path = self.directory / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps({"created": entry[0], "content": entry[1]}), "utf-8")
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.error(f"Failed to write AI cache entry {key}: {e}")
+            return
+
+        files = list(self.directory.glob("*.json"))
+        if len(files) > self.max_disk_entries:
+            files.sort(key=lambda file: file.stat().st_mtime)
+            for file in files[: len(files) - self.max_disk_entries]:
+                file.unlink(missing_ok=True)
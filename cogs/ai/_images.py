@@ -0,0 +1,230 @@
+import asyncio
+import binascii
+import hashlib
+import json
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+from ._cache import normalize_prompt
+
+DATA_URI_MARKER = b";base64,"
+# Enough of the previous chunk to find a marker, and the "data:<mime type>" before it, across chunks.
+TAIL_SIZE = 128
+# Non-image bytes kept around to describe a response that turned out to have no image in it.
+HEAD_LIMIT = 64 * 1024
+
+
+class NoImageReturned(Exception):
+    """Raised when the AI proxy answered without an image."""
+
+    def __init__(self, summary: dict):
+        super().__init__(f"The API returned no image: {summary}")
+        self.summary = summary
+
+
+class DataURIExtractor:
+    """
+    Incrementally pulls the first base64 data URI out of a JSON body and decodes it into `out`.
+
+    Chunks of the raw response are fed in as they arrive. Everything before the data URI is
+    scanned for the `;base64,` marker; after it, base64 characters are decoded in blocks of
+    four and written straight to `out`, so the encoded image is never held in memory as one
+    string. Decoding stops at the closing quote of the JSON string.
+    """
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.head = bytearray()
+        self.mime_type: str | None = None
+        self.size = 0
+
+        self._in_data = False
+        self._done = False
+        self._escaped = False
+        self._tail = b""  # The end of the previous chunk, in case the marker straddles two chunks.
+        self._pending = bytearray()  # Base64 characters that don't yet make up a full block.
+
+    @property
+    def found(self) -> bool:
+        return self.size > 0
+
+    def feed(self, chunk: bytes) -> None:
+        if self._done:
+            return
+        if not self._in_data:
+            chunk = self._find_marker(chunk)
+            if chunk is None:
+                return
+        self._decode(chunk)
+
+    def close(self) -> None:
+        """Decode whatever is left. Raises `binascii.Error` if the image data was malformed."""
+        if not self._in_data:
+            self._remember_head(self._tail)
+            self._tail = b""
+        if self._pending:
+            self.size += self.out.write(binascii.a2b_base64(bytes(self._pending), strict_mode=True))
+            self._pending.clear()
+        self._done = self._in_data
+
+    def _find_marker(self, chunk: bytes) -> bytes | None:
+        data = self._tail + chunk
+        index = data.find(DATA_URI_MARKER)
+        if index == -1:
+            self._remember_head(data[: max(0, len(data) - TAIL_SIZE)])
+            self._tail = data[-TAIL_SIZE:]
+            return None
+
+        start = data.rfind(b"data:", 0, index)
+        if start != -1:
+            mime_type = data[start + len(b"data:"):index].replace(b"\\", b"")
+            self.mime_type = mime_type.decode("ascii", "replace")
+        self._remember_head(data[:index])
+        self._tail = b""
+        self._in_data = True
+        return data[index + len(DATA_URI_MARKER):]
+
+    def _remember_head(self, data: bytes) -> None:
+        room = HEAD_LIMIT - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+
+    def _decode(self, chunk: bytes) -> None:
+        end = chunk.find(b'"')
+        if end != -1:
+            chunk = chunk[:end]
+
+        # JSON may escape "/" as "\/" and wrap long strings with "\n". After splitting on the
+        # backslash, every piece but the first starts with the escaped character.
+        pieces = chunk.split(b"\\")
+        for i, piece in enumerate(pieces):
+            if (i > 0 or self._escaped) and piece:
+                if piece[:1] in (b"n", b"r"):
+                    piece = piece[1:]
+                self._escaped = False
+            self._pending += piece
+        self._escaped = chunk.endswith(b"\\")
+
+        usable = len(self._pending) - len(self._pending) % 4
+        if usable:
+            self.size += self.out.write(binascii.a2b_base64(bytes(self._pending[:usable]), strict_mode=True))
+            del self._pending[:usable]
+
+        if end != -1:
+            self.close()
+
+    def summary(self, status: int) -> dict:
+        """Describe the non-image part of the response, for logging."""
+        try:
+            result = json.loads(self.head)
+        except ValueError:
+            return {"status_code": status, "response_bytes": len(self.head)}
+        return {
+            "status_code": status,
+            "response_keys": list(result.keys()) if isinstance(result, dict) else None,
+            "choices_present": isinstance(result, dict) and "choices" in result,
+        }
+
+
+class ImageCache:
+    """
+    A content-addressed on-disk cache of generated images.
+
+    Images are stored as one file per key, where the key is a hash of the normalized prompt and
+    the model, and the extension records the image format. The total size is capped at
+    `max_bytes`; the least recently used images are evicted first. An in-memory index of the
+    files is kept so lookups don't scan the directory.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._index: OrderedDict[str, tuple[Path, int]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        files = [file for file in self.directory.iterdir() if file.suffix != ".tmp"]
+        for file in sorted(files, key=lambda file: file.stat().st_mtime):
+            size = file.stat().st_size
+            self._index[file.stem] = (file, size)
+            self.total_bytes += size
+
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        raw = json.dumps([normalize_prompt(prompt), model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Path | None:
+        """Return the path of the cached image for `key`, or None if there isn't one."""
+        if key not in self._index:
+            self.misses += 1
+            return None
+
+        path, _ = self._index[key]
+        try:
+            path.touch()
+        except FileNotFoundError:
+            self._forget(key)
+            self.misses += 1
+            return None
+
+        self._index.move_to_end(key)
+        self.hits += 1
+        return path
+
+    async def put(self, key: str, image: BinaryIO, suffix: str = ".png") -> Path:
+        """Copy `image` into the cache under `key` and return its path."""
+        path = self.directory / f"{key}{suffix}"
+        size = await asyncio.to_thread(self._write, path, image)
+        return await self._store(key, path, size)
+
+    async def adopt(self, key: str, file: Path) -> Path:
+        """Move `file` into the cache under `key`, replacing whatever was stored for it."""
+        path = self.directory / f"{key}{file.suffix}"
+        size = await asyncio.to_thread(self._move, file, path)
+        return await self._store(key, path, size)
+
+    async def _store(self, key: str, path: Path, size: int) -> Path:
+        evicted = []
+        if (old := self._forget(key)) is not None and old != path:
+            evicted.append(old)
+        self._index[key] = (path, size)
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            old_path, old_size = self._index.popitem(last=False)[1]
+            self.total_bytes -= old_size
+            evicted.append(old_path)
+        if evicted:
+            await asyncio.to_thread(lambda: [file.unlink(missing_ok=True) for file in evicted])
+        return path
+
+    def _forget(self, key: str) -> Path | None:
+        if (entry := self._index.pop(key, None)) is None:
+            return None
+        self.total_bytes -= entry[1]
+        return entry[0]
+
+    @staticmethod
+    def _move(source: Path, path: Path) -> int:
+        os.replace(source, path)
+        return path.stat().st_size
+
+    @staticmethod
+    def _write(path: Path, image: BinaryIO) -> int:
+        tmp_path = path.with_suffix(".tmp")
+        image.seek(0)
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(image, f)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        return size
@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is an optional dependency; without it images are sent as generated.
+    Image = None
+
+EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg", "PNG": ".png"}
+MIN_QUALITY = 40
+
+
+def compress_image(
+    source: str, destination: str, image_format: str, quality: int, max_dimension: int, target_bytes: int
+) -> int:
+    """
+    Downscale and re-encode the image at `source` into `destination`, returning the new size.
+
+    The quality is lowered in steps until the result fits in `target_bytes` or `MIN_QUALITY` is
+    reached. This is CPU-heavy and runs in a worker process, so it only deals in file paths to
+    keep what crosses the process boundary small.
+    """
+    with Image.open(source) as image:
+        image.thumbnail((max_dimension, max_dimension))
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        while True:
+            image.save(destination, format=image_format, quality=quality, optimize=True)
+            size = os.path.getsize(destination)
+            if size <= target_bytes or quality <= MIN_QUALITY:
+                return size
+            quality = max(MIN_QUALITY, quality - 10)
+
+
+class ImageProcessor:
+    """Re-encodes generated images in a process pool, keeping the work off the event loop."""
+
+    def __init__(
+        self,
+        workers: int,
+        image_format: str = "WEBP",
+        quality: int = 85,
+        max_dimension: int = 1920,
+        target_bytes: int = 1024 * 1024,
+    ):
+        self.image_format = image_format
+        self.quality = quality
+        self.max_dimension = max_dimension
+        self.target_bytes = target_bytes
+        # Not forked from the bot, which is already running threads whose locks a fork would copy.
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context(start_method)
+        )
+
+        self.processed = 0
+        self.bytes_saved = 0
+        self.encode_time = 0.0
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    async def process(self, source: Path) -> tuple[Path, int, float] | None:
+        """
+        Re-encode `source` next to it.
+
+        Returns the new file, the bytes saved and the encode time, or None if re-encoding
+        didn't make the image any smaller.
+        """
+        destination = source.with_name(f"{source.stem}.encoded{EXTENSIONS[self.image_format]}")
+        original_size = source.stat().st_size
+
+        started = time.perf_counter()
+        size = await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            compress_image,
+            str(source),
+            str(destination),
+            self.image_format,
+            self.quality,
+            self.max_dimension,
+            self.target_bytes,
+        )
+        elapsed = time.perf_counter() - started
+
+        if size >= original_size:
+            destination.unlink(missing_ok=True)
+            return None
+
+        self.processed += 1
+        self.bytes_saved += original_size - size
+        self.encode_time += elapsed
+        return destination, original_size - size, elapsed
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,143 @@
+import time
+from collections import OrderedDict, deque
+
+# Roughly four characters per token for English text. It doesn't need to be exact,
+# just cheap and consistent, since it only decides how much history to keep.
+CHARS_PER_TOKEN = 4
+# How much of an old turn is kept in the running summary once it no longer fits.
+SUMMARY_EXCERPT = 120
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class Conversation:
+    """The recent turns of one channel's conversation, plus a compact summary of older ones."""
+
+    __slots__ = ("turns", "tokens", "summary", "last_used")
+
+    def __init__(self, max_turns: int):
+        self.turns: deque[tuple[str, str, int]] = deque(maxlen=max_turns)
+        self.tokens = 0
+        self.summary: deque[str] = deque()
+        self.last_used = time.monotonic()
+
+
+class ConversationStore:
+    """
+    Opt-in, per-channel conversation history for the AI commands.
+
+    Each channel (or thread) with conversation mode on keeps a ring buffer of its last
+    `max_turns` question/answer pairs. Turns are trimmed to `token_budget` estimated tokens,
+    oldest first; trimmed questions live on as short excerpts in a summary, which has a budget
+    of its own. Conversations idle for longer than `ttl` seconds are dropped, and at most
+    `max_conversations` are kept at once, so memory stays flat however many channels use it.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 10,
+        token_budget: int = 2000,
+        summary_budget: int = 200,
+        ttl: float = 30 * 60,
+        max_conversations: int = 500,
+    ):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.ttl = ttl
+        self.max_conversations = max_conversations
+
+        self._conversations: OrderedDict[int, Conversation] = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return self._get(channel_id) is not None
+
+    def start(self, channel_id: int) -> None:
+        if channel_id in self:
+            return
+        self._conversations[channel_id] = Conversation(self.max_turns)
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+            self.evicted += 1
+
+    def stop(self, channel_id: int) -> bool:
+        return self._conversations.pop(channel_id, None) is not None
+
+    def reset(self, channel_id: int) -> bool:
+        if channel_id not in self:
+            return False
+        self._conversations[channel_id] = Conversation(self.max_turns)
+        return True
+
+    def history(self, channel_id: int) -> list[dict]:
+        """Return the channel's history as chat messages, or an empty list if conversation mode is off."""
+        conversation = self._get(channel_id)
+        if conversation is None:
+            return []
+
+        messages = []
+        if conversation.summary:
+            messages.append({
+                "role": "system",
+                "content": "Earlier in this conversation the user asked about: " + "; ".join(conversation.summary),
+            })
+        for question, answer, _ in conversation.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def record(self, channel_id: int, question: str, answer: str) -> None:
+        """Add a turn to the channel's conversation, if it has one, trimming it to the token budget."""
+        conversation = self._get(channel_id)
+        if conversation is None:
+            return
+
+        if len(conversation.turns) == conversation.turns.maxlen:
+            self._drop_oldest(conversation)
+
+        tokens = estimate_tokens(question) + estimate_tokens(answer)
+        conversation.turns.append((question, answer, tokens))
+        conversation.tokens += tokens
+        while conversation.tokens > self.token_budget and len(conversation.turns) > 1:
+            self._drop_oldest(conversation)
+
+    def prune(self) -> int:
+        """Drop conversations that have been idle for longer than the TTL. Returns how many were dropped."""
+        cutoff = time.monotonic() - self.ttl
+        expired = [id_ for id_, conversation in self._conversations.items() if conversation.last_used < cutoff]
+        for channel_id in expired:
+            del self._conversations[channel_id]
+        self.evicted += len(expired)
+        return len(expired)
+
+    def _get(self, channel_id: int) -> Conversation | None:
+        conversation = self._conversations.get(channel_id)
+        if conversation is None:
+            return None
+
+        now = time.monotonic()
+        if now - conversation.last_used > self.ttl:
+            del self._conversations[channel_id]
+            self.evicted += 1
+            return None
+
+        conversation.last_used = now
+        self._conversations.move_to_end(channel_id)
+        return conversation
+
+    def _drop_oldest(self, conversation: Conversation) -> None:
+        question, _, tokens = conversation.turns.popleft()
+        conversation.tokens -= tokens
+
+        excerpt = " ".join(question.split())
+        if len(excerpt) > SUMMARY_EXCERPT:
+            excerpt = excerpt[:SUMMARY_EXCERPT].rsplit(" ", 1)[0] + "…"
+        conversation.summary.append(excerpt)
+        while sum(estimate_tokens(part) for part in conversation.summary) > self.summary_budget:
+            conversation.summary.popleft()
@@ -0,0 +1,165 @@
+import asyncio
+import re
+from collections import OrderedDict
+from typing import NamedTuple
+
+import discord
+
+from ._streaming import MESSAGE_LIMIT
+
+# A line opening or closing a fenced code block, with the language of an opening one.
+FENCE = re.compile(r"^```([^\s`]*)", re.MULTILINE)
+CLOSE_FENCE = "\n```"
+# Don't cut pages shorter than this fraction of the limit just to land on a nicer boundary.
+MIN_FILL = 0.5
+
+
+class Page(NamedTuple):
+    start: int
+    end: int
+    # The language of the code block this page starts inside of ("" if it has none), or None.
+    fence: str | None
+
+
+def _fence_after(text: str, start: int, end: int, fence: str | None) -> str | None:
+    """Which code block is open at `end`, given that `fence` was open at `start`."""
+    for match in FENCE.finditer(text, start, end):
+        fence = match.group(1) if fence is None else None
+    return fence
+
+
+def _cut(text: str, start: int, room: int) -> int:
+    """Find where to end a page that starts at `start` and has `room` characters to fill."""
+    window = text[start:start + room]
+    for separator in ("\n\n", "\n", " "):
+        cut = window.rfind(separator)
+        if cut >= room * MIN_FILL:
+            return start + cut + len(separator)
+    return start + room
+
+
+def paginate(text: str, limit: int = MESSAGE_LIMIT) -> list[Page]:
+    """
+    Split `text` into pages that fit in `limit` characters once rendered.
+
+    Pages end on paragraph, line or word boundaries where possible. A page that ends inside a
+    fenced code block closes it, and the next page reopens it with the same language, so each
+    page renders correctly on its own. Only offsets are kept; pages are rendered on demand.
+    """
+    pages = []
+    start, fence = 0, None
+    while start < len(text):
+        opener = 0 if fence is None else len(f"```{fence}\n")
+        room = limit - opener
+        if len(text) - start <= room:
+            end = len(text)
+        else:
+            # Leave space to close a code block, in case the page ends inside one.
+            end = _cut(text, start, room - len(CLOSE_FENCE))
+        pages.append(Page(start, end, fence))
+        fence = _fence_after(text, start, end, fence)
+        start = end
+    return pages
+
+
+def render_page(text: str, pages: list[Page], index: int) -> str:
+    page = pages[index]
+    content = text[page.start:page.end]
+    if page.fence is not None:
+        content = f"```{page.fence}\n{content}"
+    if index + 1 < len(pages) and pages[index + 1].fence is not None:
+        content = content.rstrip("\n") + CLOSE_FENCE
+    return content
+
+
+class AnswerPager(discord.ui.View):
+    """Pages through an answer that is too long for one message."""
+
+    def __init__(self, text: str, pages: list[Page], timeout: float, on_expire=None):
+        super().__init__(timeout=timeout)
+        self.text = text
+        self.pages = pages
+        self.current_page = 0
+        self.message: discord.Message | None = None
+        self.on_expire = on_expire
+        self.update_buttons()
+
+    def render(self) -> str:
+        return render_page(self.text, self.pages, self.current_page)
+
+    def update_buttons(self):
+        self.previous_button.disabled = self.current_page == 0
+        self.next_button.disabled = self.current_page == len(self.pages) - 1
+        self.page_button.label = f"{self.current_page + 1}/{len(self.pages)}"
+
+    @discord.ui.button(label="◀️", style=discord.ButtonStyle.primary)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current_page -= 1
+        self.update_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.secondary, disabled=True)
+    async def page_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        pass
+
+    @discord.ui.button(label="▶️", style=discord.ButtonStyle.primary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current_page += 1
+        self.update_buttons()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    async def on_timeout(self):
+        await self.expire()
+
+    async def expire(self):
+        """Stop paging, drop the answer and take the buttons off the message."""
+        self.stop()
+        self.text = ""
+        self.pages = []
+        if self.on_expire:
+            self.on_expire(self)
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
+class PagerStore:
+    """
+    Keeps track of the live pagers so their memory stays bounded.
+
+    Each pager holds its answer until it times out. When more than `max_pagers` are live at
+    once, the oldest ones are expired early.
+    """
+
+    def __init__(self, max_pagers: int = 100, timeout: float = 10 * 60):
+        self.max_pagers = max_pagers
+        self.timeout = timeout
+        self._pagers: OrderedDict[int, AnswerPager] = OrderedDict()
+        # Early expiries, kept referenced until they finish so they aren't garbage collected.
+        self._expiring: set[asyncio.Task] = set()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._pagers)
+
+    def create(self, text: str, pages: list[Page]) -> AnswerPager:
+        pager = AnswerPager(text, pages, self.timeout, on_expire=self._forget)
+        self._pagers[id(pager)] = pager
+        self.created += 1
+        while len(self._pagers) > self.max_pagers:
+            _, oldest = self._pagers.popitem(last=False)
+            self.evicted += 1
+            task = asyncio.create_task(oldest.expire())
+            self._expiring.add(task)
+            task.add_done_callback(self._expiring.discard)
+        return pager
+
+    def _forget(self, pager: AnswerPager) -> None:
+        self._pagers.pop(id(pager), None)
+
+    async def close(self) -> None:
+        for pager in list(self._pagers.values()):
+            await pager.expire()
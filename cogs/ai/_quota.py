@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaEngine:
+    """
+    Keeps AI usage counters in memory and persists them write-behind.
+
+    Three limits are enforced: the global `daily_limit`, and sliding windows of `window` seconds
+    per user and per guild. Checking and charging only touches memory; a call to `flush` writes
+    the counters to `path` through a temporary file and an atomic rename, so a crash mid-write
+    never leaves a truncated file behind.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        daily_limit: int,
+        user_limit: int | None = None,
+        guild_limit: int | None = None,
+        window: float = 60 * 60,
+    ):
+        self.path = path
+        self.daily_limit = daily_limit
+        self.user_limit = user_limit
+        self.guild_limit = guild_limit
+        self.window = window
+
+        self.date = ""
+        self.count = 0
+        self._user_windows: dict[int, deque[float]] = {}
+        self._guild_windows: dict[int, deque[float]] = {}
+
+        self.pending_writes = 0
+        self._flush_lock = asyncio.Lock()
+
+    def load(self) -> None:
+        """Load persisted counters. This does blocking I/O, so run it off the event loop."""
+        try:
+            data = json.loads(self.path.read_text("utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            logger.info("Usage file not found or invalid. Initializing new data.")
+            return
+
+        self.date = data.get("date", "")
+        self.count = data.get("count", 0)
+        # Files written before the sliding windows existed only have the date and count.
+        for key, windows in (("users", self._user_windows), ("guilds", self._guild_windows)):
+            for id_, stamps in data.get(key, {}).items():
+                windows[int(id_)] = deque(stamps)
+        logger.info(f"Loaded usage data: {self.date} ({self.count} uses)")
+
+    def check(self, user_id: int, guild_id: int | None) -> str | None:
+        """Like `try_acquire`, but only checks the limits, without charging anything."""
+        return self._check(user_id, guild_id, time.time())[0]
+
+    def try_acquire(self, user_id: int, guild_id: int | None) -> str | None:
+        """
+        Charge one use to `user_id` and `guild_id` if every limit allows it.
+
+        Returns None on success, or a message describing the limit that was hit.
+        """
+        now = time.time()
+        denial, user_window, guild_window = self._check(user_id, guild_id, now)
+        if denial:
+            return denial
+
+        self.count += 1
+        user_window.append(now)
+        if guild_window is not None:
+            guild_window.append(now)
+        self.pending_writes += 1
+        return None
+
+    def _check(
+        self, user_id: int, guild_id: int | None, now: float
+    ) -> tuple[str | None, deque[float], deque[float] | None]:
+        """Return the limit `user_id` and `guild_id` would go over, if any, and their current windows."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        if self.date != today:
+            logger.info("New day detected. Resetting usage count.")
+            self.date = today
+            self.count = 0
+
+        user_window = self._window(self._user_windows, user_id, now)
+        guild_window = self._window(self._guild_windows, guild_id, now) if guild_id is not None else None
+
+        if self.count >= self.daily_limit:
+            logger.warning(f"AI daily limit reached. Count: {self.count}")
+            denial = (
+                f":x: The daily AI command limit of {self.daily_limit} has been reached. "
+                "Please try again tomorrow."
+            )
+        elif self.user_limit is not None and len(user_window) >= self.user_limit:
+            denial = self._window_message("You have", self.user_limit, user_window[0], now)
+        elif guild_window is not None and self.guild_limit is not None and len(guild_window) >= self.guild_limit:
+            denial = self._window_message("This server has", self.guild_limit, guild_window[0], now)
+        else:
+            denial = None
+        return denial, user_window, guild_window
+
+    def _window(self, windows: dict[int, deque[float]], id_: int, now: float) -> deque[float]:
+        window = windows.setdefault(id_, deque())
+        while window and window[0] <= now - self.window:
+            window.popleft()
+        return window
+
+    def _window_message(self, subject: str, limit: int, oldest: float, now: float) -> str:
+        retry_at = int(oldest + self.window)
+        return (
+            f":x: {subject} used the AI commands {limit} times in the last "
+            f"{self.window // 60:.0f} minutes. Try again <t:{retry_at}:R>."
+        )
+
+    def snapshot(self) -> dict:
+        """Return the counters in their persisted form, dropping windows that have gone idle."""
+        cutoff = time.time() - self.window
+        data = {"date": self.date, "count": self.count}
+        for key, windows in (("users", self._user_windows), ("guilds", self._guild_windows)):
+            for id_ in [id_ for id_, window in windows.items() if not window or window[-1] <= cutoff]:
+                del windows[id_]
+            data[key] = {str(id_): list(window) for id_, window in windows.items()}
+        return data
+
+    async def flush(self) -> None:
+        """Write the counters to disk if anything changed since the last flush."""
+        async with self._flush_lock:
+            if not self.pending_writes:
+                return
+            pending, self.pending_writes = self.pending_writes, 0
+            data = self.snapshot()
+            try:
+                await asyncio.to_thread(self._write, data)
+            except OSError as e:
+                self.pending_writes += pending
+                logger.error(f"Failed to write to usage file: {e}", exc_info=True)
+
+    def _write(self, data: dict) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the upstream while the circuit breaker is open."""
+
+    def __init__(self):
+        super().__init__(
+            ":x: The AI service is having trouble right now. Please try again in a little while."
+        )
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether `error` is a transient upstream failure worth another attempt."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, TimeoutError))
+
+
+def is_model_error(error: BaseException) -> bool:
+    """Whether the upstream rejected a request because of its model, e.g. an id it doesn't know."""
+    if not isinstance(error, aiohttp.ClientResponseError):
+        return False
+    # A 400 is usually the prompt's fault, unless the error is about the model.
+    return error.status == 404 or (error.status in (400, 422) and "model" in error.message.lower())
+
+
+async def raise_for_status(response: aiohttp.ClientResponse) -> None:
+    """Like `response.raise_for_status`, but the error keeps the start of the body, which says what was wrong."""
+    if response.status < 400:
+        return
+    # Reading it also drains the body, so the connection can go back to the pool.
+    body = (await response.read()).decode(errors="replace").strip()
+    raise aiohttp.ClientResponseError(
+        response.request_info,
+        response.history,
+        status=response.status,
+        message=body[:300] or (response.reason or ""),
+        headers=response.headers,
+    )
+
+
+class LatencyTracker:
+    """Keeps the latest `size` latency samples and answers percentile queries over them."""
+
+    def __init__(self, size: int = 200):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def percentile(self, quantile: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an upstream that keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and every call fails fast
+    with `CircuitOpen`. While open, `probe` is called every `probe_interval` seconds in the
+    background, and the breaker closes again as soon as a probe succeeds.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[bool]],
+        failure_threshold: int = 5,
+        probe_interval: float = 15,
+    ):
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self._probe_task: asyncio.Task | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    @property
+    def state(self) -> str:
+        return "open" if self.is_open else "closed"
+
+    def check(self) -> None:
+        if self.is_open:
+            raise CircuitOpen
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold and not self.is_open:
+            logger.warning(f"Opening the AI circuit breaker after {self.failures} failures.")
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            self._probe_task = asyncio.create_task(self._probe_until_healthy())
+
+    def close(self) -> None:
+        if self._probe_task:
+            self._probe_task.cancel()
+            self._probe_task = None
+        self.opened_at = None
+        self.failures = 0
+
+    async def _probe_until_healthy(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                healthy = await self.probe()
+            except Exception as e:
+                logger.info(f"AI upstream probe failed: {e}")
+                healthy = False
+
+            if healthy:
+                logger.info("AI upstream probe succeeded, closing the circuit breaker.")
+                self._probe_task = None
+                self.opened_at = None
+                self.failures = 0
+                return
+
+
+class Upstream:
+    """
+    Calls an unreliable upstream with a per-attempt deadline, retries, hedging and a circuit breaker.
+
+    Transient failures (connection errors, timeouts, 429 and 5xx responses) are retried up to
+    `max_retries` times with full-jitter exponential backoff, honouring `Retry-After` when the
+    upstream sends one. A hedged call starts a second attempt if the first one hasn't finished
+    after the recent p95 latency, and uses whichever finishes first.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        attempt_timeout: float = 60,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8,
+        hedge_quantile: float = 0.95,
+        min_hedge_samples: int = 20,
+    ):
+        self.breaker = breaker
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_samples = min_hedge_samples
+
+        self.latency = LatencyTracker()
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.short_circuited = 0
+
+    async def call(
+        self,
+        attempt: Callable[[], Awaitable[Any]],
+        *,
+        hedge: bool = False,
+        apply_deadline: bool = True,
+        can_retry: Callable[[BaseException], bool] | None = None,
+    ) -> Any:
+        """
+        Run `attempt` until it succeeds or can't be retried any more.
+
+        Set `apply_deadline` to False for calls that enforce their own deadline, like streams.
+        `can_retry` can veto a retry, e.g. once part of a stream has been shown.
+        """
+        deadline = self.attempt_timeout if apply_deadline else None
+
+        try:
+            self.breaker.check()
+        except CircuitOpen:
+            self.short_circuited += 1
+            raise
+
+        for attempt_number in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                if hedge:
+                    result = await self._hedged(attempt, deadline)
+                else:
+                    result = await self._attempt(attempt, deadline)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self.breaker.record_failure()
+                if (
+                    attempt_number == self.max_retries
+                    or self.breaker.is_open
+                    or (can_retry and not can_retry(e))
+                ):
+                    raise
+
+                delay = self._backoff(attempt_number, e)
+                logger.info(f"AI request failed ({e!r}), retrying in {delay:.2f}s.")
+                self.retries += 1
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                self.latency.record(time.monotonic() - started)
+                return result
+
+    async def _attempt(self, attempt: Callable[[], Awaitable[Any]], deadline: float | None) -> Any:
+        self.attempts += 1
+        async with asyncio.timeout(deadline):
+            return await attempt()
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[Any]], deadline: float | None) -> Any:
+        first = asyncio.create_task(self._attempt(attempt, deadline))
+        pending = {first}
+        try:
+            if len(self.latency.samples) >= self.min_hedge_samples:
+                hedge_delay = self.latency.percentile(self.hedge_quantile)
+                done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+                if done:
+                    # Finished before a hedge was needed: its result, or its own error.
+                    return first.result()
+                self.hedges += 1
+                pending.add(asyncio.create_task(self._attempt(attempt, deadline)))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _backoff(self, attempt_number: int, error: BaseException) -> float:
+        if isinstance(error, aiohttp.ClientResponseError) and error.headers:
+            retry_after = error.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt_number))
@@ -0,0 +1,160 @@
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from ._resilience import LatencyTracker
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    mode: str
+    prompt_chars: int
+    model: str
+    reason: str
+    at: float
+
+
+class ModelStats:
+    """
+    Rolling latency and error statistics for one model.
+
+    Outcomes older than `outcome_ttl` seconds are forgotten, so a model that failed a while ago
+    isn't judged by it forever, even if it gets no requests in the meantime.
+    """
+
+    def __init__(self, window: int = 50, outcome_ttl: float = 300):
+        self.latency = LatencyTracker(window)
+        self.outcome_ttl = outcome_ttl
+        # (when, whether it succeeded)
+        self._outcomes: deque[tuple[float, bool]] = deque(maxlen=window)
+        self.picks = 0
+        self.last_probe = float("-inf")
+        self.last_failure = float("-inf")
+
+    @property
+    def outcomes(self) -> list[bool]:
+        cutoff = time.monotonic() - self.outcome_ttl
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        return [ok for _, ok in self._outcomes]
+
+    @property
+    def error_rate(self) -> float:
+        if not (outcomes := self.outcomes):
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self._outcomes.append((time.monotonic(), ok))
+        if not ok:
+            self.last_failure = time.monotonic()
+        if ok:
+            self.latency.record(latency)
+
+
+class ModelRouter:
+    """
+    Picks a model for each AI request from an ordered list of candidates per mode.
+
+    The first candidate of a mode is its preferred model. A model whose recent error rate is
+    above `max_error_rate` is skipped, so requests fail over to the next healthy candidate.
+    Errors expire after `outcome_ttl` seconds. Meanwhile, a skipped model is sent one request
+    every `probe_interval` seconds, so it is picked again as soon as it recovers.
+    Short text prompts, which don't need the strongest model, go to whichever healthy candidate
+    has the lowest recent p50 latency instead. Each candidate is measured with its first
+    `min_samples` of them, though not again within `probe_interval` of a failure, and an
+    `explore_rate` share goes to a random measured candidate after that, so every candidate's
+    latency stays current.
+    """
+
+    def __init__(
+        self,
+        routes: dict[str, list[str]],
+        short_prompt_chars: int = 280,
+        max_error_rate: float = 0.5,
+        min_samples: int = 5,
+        outcome_ttl: float = 300,
+        probe_interval: float = 30,
+        explore_rate: float = 0.05,
+        rng: random.Random | None = None,
+    ):
+        self.routes = {mode: list(models) for mode, models in routes.items()}
+        self.short_prompt_chars = short_prompt_chars
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self.explore_rate = explore_rate
+        self.rng = rng or random.Random()
+
+        self.stats = {
+            model: ModelStats(outcome_ttl=outcome_ttl) for models in routes.values() for model in models
+        }
+        self.decisions: deque[RoutingDecision] = deque(maxlen=20)
+
+    def restrict(self, available: set[str]) -> list[str]:
+        """
+        Stop routing to candidates that aren't in `available`, and return them.
+
+        A mode keeps all of its candidates if none of them are available, as the list is more
+        likely to be incomplete than every model to be gone.
+        """
+        dropped = []
+        for mode, models in self.routes.items():
+            if kept := [model for model in models if model in available]:
+                dropped += [model for model in models if model not in kept]
+                self.routes[mode] = kept
+        return dropped
+
+    def _healthy(self, model: str) -> bool:
+        stats = self.stats[model]
+        return len(stats.outcomes) < self.min_samples or stats.error_rate <= self.max_error_rate
+
+    def _probe_due(self, model: str, now: float) -> bool:
+        stats = self.stats[model]
+        return now - max(stats.last_probe, stats.last_failure) >= self.probe_interval
+
+    def choose(self, mode: str, prompt_chars: int) -> str:
+        """Pick the model for a `mode` request whose prompt is `prompt_chars` characters long."""
+        now = time.monotonic()
+        candidates = self.routes[mode]
+        healthy = [model for model in candidates if self._healthy(model)]
+        probing = [model for model in candidates if model not in healthy and self._probe_due(model, now)]
+
+        if probing:
+            # Half-open: one request to see whether a degraded model has recovered.
+            model = probing[0]
+            self.stats[model].last_probe = now
+            reason = "probing degraded model"
+        elif not healthy:
+            model = min(candidates, key=lambda model: self.stats[model].error_rate)
+            reason = "all degraded, least failing"
+        elif mode == "text" and prompt_chars <= self.short_prompt_chars:
+            measured = [model for model in healthy if len(self.stats[model].latency.samples) >= self.min_samples]
+            # A model that just failed isn't measured again until its probe is due, so one that keeps
+            # failing, like an unknown id, only gets a few requests before it counts as degraded.
+            unmeasured = [model for model in healthy if model not in measured and self._probe_due(model, now)]
+            if unmeasured:
+                # Only the first few requests to each candidate, so they can be compared.
+                model = self.rng.choice(unmeasured)
+                reason = "short prompt, measuring latency"
+            elif not measured:
+                model = healthy[0]
+                reason = "short prompt, no latency data yet"
+            elif self.rng.random() < self.explore_rate:
+                model = self.rng.choice(measured)
+                reason = "short prompt, exploring"
+            else:
+                model = min(measured, key=lambda model: self.stats[model].latency.percentile(0.5))
+                reason = "short prompt, fastest"
+        else:
+            model = healthy[0]
+            reason = "preferred" if model == candidates[0] else "failover"
+
+        self.stats[model].picks += 1
+        self.decisions.append(RoutingDecision(mode, prompt_chars, model, reason, time.time()))
+        return model
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        """Record how a request to `model` went."""
+        self.stats[model].record(latency, ok)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+
+class QueueFull(Exception):
+    """Raised when a lane's queue has no room for another request."""
+
+    def __init__(self, lane: str, depth: int):
+        super().__init__(
+            f":x: The AI {lane} queue is full ({depth} requests waiting). Please try again in a moment."
+        )
+        self.lane = lane
+        self.depth = depth
+
+
+class Lane:
+    """
+    One class of AI work with its own concurrency cap and a bounded, fair wait queue.
+
+    Waiters are grouped by guild and then by user. Dispatch takes the first waiter of the first
+    user of the first guild and then rotates both to the back, so a guild (or a user within a
+    guild) sending a burst of requests can't starve everybody else.
+    """
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+
+        self.active = 0
+        self.depth = 0
+        self._queues: OrderedDict[int | None, OrderedDict[int, deque[asyncio.Future]]] = OrderedDict()
+
+        self.served = 0
+        self.rejected = 0
+        self.waits: deque[float] = deque(maxlen=256)
+
+    @property
+    def has_room(self) -> bool:
+        return self.active < self.concurrency
+
+    def push(self, guild_id: int | None, user_id: int, waiter: asyncio.Future) -> None:
+        users = self._queues.setdefault(guild_id, OrderedDict())
+        users.setdefault(user_id, deque()).append(waiter)
+        self.depth += 1
+
+    def pop(self) -> asyncio.Future | None:
+        """Take the next waiter in round-robin order across guilds and users."""
+        while self._queues:
+            guild_id, users = next(iter(self._queues.items()))
+            user_id, waiters = next(iter(users.items()))
+            waiter = waiters.popleft()
+            self.depth -= 1
+
+            if waiters:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            if users:
+                self._queues.move_to_end(guild_id)
+            else:
+                del self._queues[guild_id]
+
+            if not waiter.done():
+                return waiter
+        return None
+
+    def discard(self, guild_id: int | None, user_id: int, waiter: asyncio.Future) -> None:
+        """Remove a waiter that gave up before it was dispatched."""
+        users = self._queues.get(guild_id)
+        if not users or user_id not in users:
+            return
+        try:
+            users[user_id].remove(waiter)
+        except ValueError:
+            return
+        self.depth -= 1
+        if not users[user_id]:
+            del users[user_id]
+        if not users:
+            del self._queues[guild_id]
+
+
+class AIScheduler:
+    """Caps concurrent upstream AI requests globally and per lane, queueing the overflow fairly."""
+
+    def __init__(self, global_limit: int, lanes: dict[str, tuple[int, int]]):
+        """`lanes` maps a lane name to its `(concurrency, max_queue)`."""
+        self.global_limit = global_limit
+        self.global_active = 0
+        self.lanes = {name: Lane(name, *limits) for name, limits in lanes.items()}
+        self._lane_order = deque(self.lanes.values())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        lane_name: str,
+        guild_id: int | None,
+        user_id: int,
+        on_queued: Callable[[int], Awaitable[None]] | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold one slot of `lane_name` for the duration of the block.
+
+        If no slot is free, the request waits in the lane's queue and `on_queued` is called with
+        its position. If the queue is full, `QueueFull` is raised straight away.
+        """
+        lane = self.lanes[lane_name]
+        enqueued_at = time.monotonic()
+
+        if lane.depth == 0 and lane.has_room and self.global_active < self.global_limit:
+            self._grant(lane)
+        elif lane.depth >= lane.max_queue:
+            lane.rejected += 1
+            raise QueueFull(lane.name, lane.depth)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            lane.push(guild_id, user_id, waiter)
+            try:
+                if on_queued:
+                    await on_queued(lane.depth)
+                await waiter
+            except BaseException:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was granted just as we were cancelled; hand it back.
+                    self._release(lane)
+                else:
+                    lane.discard(guild_id, user_id, waiter)
+                raise
+
+        lane.waits.append(time.monotonic() - enqueued_at)
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def _grant(self, lane: Lane) -> None:
+        lane.active += 1
+        lane.served += 1
+        self.global_active += 1
+
+    def _release(self, lane: Lane) -> None:
+        lane.active -= 1
+        self.global_active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued requests, alternating between lanes."""
+        progress = True
+        while progress and self.global_active < self.global_limit:
+            progress = False
+            for _ in range(len(self._lane_order)):
+                lane = self._lane_order[0]
+                self._lane_order.rotate(-1)
+                if not lane.has_room or not lane.depth:
+                    continue
+                waiter = lane.pop()
+                if waiter is None:
+                    continue
+                self._grant(lane)
+                waiter.set_result(None)
+                progress = True
+                break
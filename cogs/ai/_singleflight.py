@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+import json
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+def payload_key(payload: dict) -> str:
+    """Hash a request payload so that identical requests map to the same key."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single in-flight call.
+
+    The first caller for a key (the leader) runs the call. Anyone else asking for the same key
+    while it is still running waits for the leader's result instead of starting their own call,
+    and gets the same result or exception.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Run `func` unless a call for `key` is already in flight, in which case wait for that one.
+
+        Returns the result and whether it was shared from another caller's call.
+        """
+        if (future := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            # Shield the shared future so a follower giving up doesn't cancel it for everyone.
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(RuntimeError("The shared request was cancelled."))
+            future.exception()  # Mark as retrieved; nobody may be waiting for it.
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import aiohttp
+import discord
+
+MESSAGE_LIMIT = 2000
+# Discord allows roughly five message edits per five seconds per channel, so edits are coalesced.
+EDIT_INTERVAL = 1.5
+
+
+async def iter_sse_content(response: aiohttp.ClientResponse) -> AsyncIterator[str]:
+    """Yield the content deltas of an OpenAI-style server-sent event stream."""
+    async for raw_line in response.content:
+        line = raw_line.decode("utf-8").strip()
+        if not line.startswith("data:"):
+            # Blank separators, comments (": keep-alive") and other event fields.
+            continue
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+        choices = chunk.get("choices")
+        if not choices:
+            continue
+        delta = (choices[0].get("delta") or {}).get("content")
+        if delta:
+            yield delta
+
+
+def _split_point(text: str, limit: int) -> int:
+    """Find where to cut `text` so the first part fits in `limit` characters."""
+    for separator in ("\n", " "):
+        cut = text.rfind(separator, 0, limit)
+        if cut > 0:
+            return cut + 1
+    return limit
+
+
+class StreamingReply:
+    """
+    Progressively renders a streamed answer into the deferred response of an interaction.
+
+    The first token is shown straight away, after which edits are coalesced to at most one per
+    `interval` seconds. Once the text outgrows a message, the current message is finalised and
+    the rest rolls over into a new followup message.
+    """
+
+    def __init__(self, interaction: discord.Interaction, interval: float = EDIT_INTERVAL):
+        self.interaction = interaction
+        self.interval = interval
+        self.text = ""
+
+        self._offset = 0  # Where the message currently being edited starts within `text`.
+        self._message: discord.WebhookMessage | None = None  # None is the original response.
+        self._rendered = ""
+        self._last_edit = 0.0
+        self._lock = asyncio.Lock()
+        self._pending_flush: asyncio.Task | None = None
+
+    async def feed(self, delta: str) -> None:
+        """Append `delta` to the answer, editing the message if the edit interval has passed."""
+        self.text += delta
+
+        loop = asyncio.get_running_loop()
+        elapsed = loop.time() - self._last_edit
+        if not self._rendered or elapsed >= self.interval:
+            await self._flush()
+        elif self._pending_flush is None:
+            # Make sure the tail still shows up if the stream stalls before the next token.
+            self._pending_flush = asyncio.create_task(self._delayed_flush(self.interval - elapsed))
+
+    async def finish(self) -> bool:
+        """Render whatever is left. Returns False if nothing was ever streamed."""
+        if self._pending_flush:
+            self._pending_flush.cancel()
+            self._pending_flush = None
+
+        if not self.text.strip():
+            return False
+
+        await self._flush()
+        return True
+
+    async def _delayed_flush(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._pending_flush = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            pending = self.text[self._offset:]
+            while len(pending) > MESSAGE_LIMIT:
+                cut = _split_point(pending, MESSAGE_LIMIT)
+                await self._render(pending[:cut])
+                self._offset += cut
+                pending = self.text[self._offset:]
+                self._message = await self.interaction.followup.send(
+                    pending[:MESSAGE_LIMIT], wait=True
+                )
+                self._rendered = pending[:MESSAGE_LIMIT]
+
+            if pending and pending != self._rendered:
+                await self._render(pending)
+
+            self._last_edit = asyncio.get_running_loop().time()
+
+    async def _render(self, content: str) -> None:
+        if content == self._rendered:
+            return
+        if self._message is None:
+            await self.interaction.edit_original_response(content=content)
+        else:
+            await self._message.edit(content=content)
+        self._rendered = content
@@ -0,0 +1,805 @@
+import asyncio
+import binascii
+import logging
+import os
+import random
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+import aiohttp
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from dotenv import load_dotenv
+
+from ._cache import ResponseCache
+from ._images import DataURIExtractor, ImageCache, NoImageReturned
+from ._imaging import ImageProcessor
+from ._memory import ConversationStore
+from ._pager import PagerStore, paginate
+from ._quota import QuotaEngine
+from ._resilience import (
+    CircuitBreaker,
+    CircuitOpen,
+    Upstream,
+    is_model_error,
+    is_retryable,
+    raise_for_status,
+)
+from ._router import ModelRouter
+from ._scheduler import AIScheduler, QueueFull
+from ._singleflight import SingleFlight, payload_key
+from ._streaming import StreamingReply, iter_sse_content
+
+load_dotenv()
+
+PERSONALITY = [
+    "discord zoomer",
+    "potter head",
+    "roasting mode",
+    "'You are absolutely right' mode",
+]
+AI_API_KEY = os.getenv("AI_API_KEY")
+# Point AI_API_URL at another OpenAI-style proxy, like tools/fake_ai_proxy.py for load tests.
+API_BASE_URL = os.getenv("AI_API_URL", "https://ai.hackclub.com/proxy/v1").rstrip("/")
+URL = f"{API_BASE_URL}/chat/completions"
+MODELS_URL = f"{API_BASE_URL}/models"
+USAGE_FILE = Path(__file__).parent.parent / "ai_usage.json"
+DAILY_LIMIT = 20
+# Sliding-window limits on top of the daily one, so a single user or server can't use it all up.
+USAGE_WINDOW = 60 * 60
+USER_WINDOW_LIMIT = 5
+GUILD_WINDOW_LIMIT = 15
+# Usage counters live in memory and are written to USAGE_FILE every FLUSH_INTERVAL seconds,
+# or sooner once FLUSH_BATCH uses have piled up.
+FLUSH_INTERVAL = 30
+FLUSH_BATCH = 5
+# At most MAX_CONCURRENT_REQUESTS upstream calls run at once. Each lane has its own cap so slow image
+# generations can't starve text answers, and a bounded queue so bursts are refused instead of timing out.
+MAX_CONCURRENT_REQUESTS = 5
+SCHEDULER_LANES = {
+    # lane: (concurrency, max_queue)
+    "image": (2, 10),
+    "text": (4, 25),
+}
+QUEUE_NOTICE = "ai_queue_notice"
+# Candidate models per mode, most preferred first. Requests fail over down the list when a model's
+# recent error rate is too high, and short text prompts go to whichever model is currently fastest.
+MODEL_ROUTES = {
+    "text": ["google/gemini-2.5-flash", "google/gemini-2.5-flash-lite", "openai/gpt-4.1-mini"],
+    "image": ["google/gemini-2.5-flash-image", "google/gemini-2.5-flash-image-preview"],
+}
+SHORT_PROMPT_CHARS = 280
+MAX_MODEL_ERROR_RATE = 0.5
+# The cache and request coalescing are keyed on the preferred model; the router picks the actual one.
+TEXT_MODEL = MODEL_ROUTES["text"][0]
+IMAGE_MODEL = MODEL_ROUTES["image"][0]
+# Stream completions token by token into the reply instead of waiting for the whole answer.
+STREAM_RESPONSES = True
+
+# Repeated questions are answered from memory (and disk, if a directory is set) without using quota.
+CACHE_SIZE = 256
+CACHE_TTL = 6 * 60 * 60
+CACHE_DIR: Path | None = Path("data/ai_cache")
+# Generated images are decoded straight from the response stream into a buffer that spills to disk
+# past SPOOL_MAX_SIZE, then kept in a content-addressed cache so repeated prompts are served from disk.
+IMAGE_CACHE_DIR = Path("data/ai_images")
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+SPOOL_MAX_SIZE = 2 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# With Pillow installed, images are downscaled and re-encoded in a process pool before upload,
+# lowering the quality until they fit IMAGE_TARGET_BYTES.
+POSTPROCESS_IMAGES = True
+IMAGE_FORMAT = "WEBP"
+IMAGE_QUALITY = 85
+IMAGE_MAX_DIMENSION = 1920
+IMAGE_TARGET_BYTES = 1024 * 1024
+IMAGE_WORKERS = 1
+# Conversation mode keeps a channel's last few turns, trimmed to an estimated token budget,
+# and forgets the conversation after CONVERSATION_TTL seconds of inactivity.
+CONVERSATION_MAX_TURNS = 10
+CONVERSATION_TOKEN_BUDGET = 2000
+CONVERSATION_TTL = 30 * 60
+MAX_CONVERSATIONS = 500
+# Answers too long for one message are sent as the first page with buttons for the rest. A pager
+# only keeps the answer and its page offsets, for PAGER_TIMEOUT seconds and at most MAX_PAGERS at once.
+PAGER_TIMEOUT = 10 * 60
+MAX_PAGERS = 100
+
+# Requests go over the bot's shared HTTP session, so connections to the proxy are kept alive and
+# reused between prompts. Completions can take a while, so they get a longer read timeout.
+API_HEADERS = {"Authorization": f"Bearer {AI_API_KEY}"}
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=10, sock_connect=10, sock_read=120)
+# Listing the models at load time must not hold up the bot if the proxy is slow.
+MODELS_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Each attempt gets ATTEMPT_TIMEOUT seconds. Timeouts, 429s and 5xx responses are retried with
+# jittered backoff, and slow non-streamed text completions are hedged with a second attempt after the
+# recent p95.
+# After BREAKER_THRESHOLD consecutive failures, calls fail fast until a background probe succeeds.
+ATTEMPT_TIMEOUT = 90
+MAX_RETRIES = 2
+HEDGE_REQUESTS = True
+BREAKER_THRESHOLD = 5
+BREAKER_PROBE_INTERVAL = 15
+
+
+async def ai_commands_check(interaction: discord.Interaction) -> bool:
+    cog = interaction.client.get_cog("AI")
+    if not cog:
+        # This is an unlikely scenario, but a good safeguard.
+        raise app_commands.CheckFailure("The AI cog is not loaded.")
+
+    # 1. API Key Check
+    if not AI_API_KEY:
+        raise app_commands.CheckFailure(":x: The AI API key is not configured. Please set the `AI_API_KEY` in the `.env` file.")
+
+    # 2. Usage is charged by the command itself, only when it actually has to call the API,
+    # so answers served from the cache don't count against the limits.
+    return True
+
+class UsageLimitReached(Exception):
+    """Raised when an AI request would go over one of the usage limits."""
+
+    def __init__(self, message: str, interaction: discord.Interaction):
+        super().__init__(message)
+        # Whose request it was, as followers of a coalesced request get the leader's exception.
+        self.interaction = interaction
+
+
+class AI(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = logging.getLogger(__name__)
+        self.quota = QuotaEngine(
+            USAGE_FILE,
+            daily_limit=DAILY_LIMIT,
+            user_limit=USER_WINDOW_LIMIT,
+            guild_limit=GUILD_WINDOW_LIMIT,
+            window=USAGE_WINDOW,
+        )
+        # Early flushes, kept referenced until they finish so they aren't garbage collected.
+        self._flush_tasks: set[asyncio.Task] = set()
+        self.session: aiohttp.ClientSession | None = None
+        self.cache = ResponseCache(max_entries=CACHE_SIZE, ttl=CACHE_TTL, directory=CACHE_DIR)
+        self.image_cache = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+        self.image_processor: ImageProcessor | None = None
+        self.conversations = ConversationStore(
+            max_turns=CONVERSATION_MAX_TURNS,
+            token_budget=CONVERSATION_TOKEN_BUDGET,
+            ttl=CONVERSATION_TTL,
+            max_conversations=MAX_CONVERSATIONS,
+        )
+        self.pagers = PagerStore(max_pagers=MAX_PAGERS, timeout=PAGER_TIMEOUT)
+        # Identical requests that arrive while one is already running share its result.
+        self.inflight = SingleFlight()
+        self.scheduler = AIScheduler(MAX_CONCURRENT_REQUESTS, SCHEDULER_LANES)
+        # Text and image calls share the breaker, since they go to the same proxy, but track
+        # their latencies separately so slow image generations don't skew text hedging.
+        self.breaker = CircuitBreaker(
+            self._probe_upstream,
+            failure_threshold=BREAKER_THRESHOLD,
+            probe_interval=BREAKER_PROBE_INTERVAL,
+        )
+        self.text_upstream = Upstream(
+            self.breaker, attempt_timeout=ATTEMPT_TIMEOUT, max_retries=MAX_RETRIES
+        )
+        self.image_upstream = Upstream(
+            self.breaker, attempt_timeout=ATTEMPT_TIMEOUT, max_retries=MAX_RETRIES
+        )
+        self.router = ModelRouter(
+            MODEL_ROUTES,
+            short_prompt_chars=SHORT_PROMPT_CHARS,
+            max_error_rate=MAX_MODEL_ERROR_RATE,
+        )
+
+    async def cog_load(self) -> None:
+        await asyncio.to_thread(self.quota.load)
+        self.flush_usage.start()
+        self.prune_conversations.start()
+
+        if POSTPROCESS_IMAGES and ImageProcessor.available():
+            self.image_processor = ImageProcessor(
+                IMAGE_WORKERS,
+                image_format=IMAGE_FORMAT,
+                quality=IMAGE_QUALITY,
+                max_dimension=IMAGE_MAX_DIMENSION,
+                target_bytes=IMAGE_TARGET_BYTES,
+            )
+        elif POSTPROCESS_IMAGES:
+            self.logger.info("Pillow is not installed, generated images will be sent as-is.")
+
+        self.session = self.bot.http_client.session
+        await self._check_models()
+
+    async def cog_unload(self) -> None:
+        self.flush_usage.cancel()
+        self.prune_conversations.cancel()
+        self.breaker.close()
+        if self.image_processor:
+            self.image_processor.shutdown()
+        await self.pagers.close()
+        await self.quota.flush()
+
+    async def _post_completion(self, payload: dict) -> tuple[int, dict]:
+        """POST `payload` to the AI proxy over the shared session and return the status and JSON body."""
+        async with self.session.post(
+            URL, json=payload, headers=API_HEADERS, timeout=REQUEST_TIMEOUT
+        ) as response:
+            await raise_for_status(response)
+            return response.status, await response.json()
+
+    async def _routed(self, mode: str, payload: dict, send: Callable[[dict], Awaitable[Any]]) -> Any:
+        """Pick a model for one attempt at `payload`, `send` it and record how that model did."""
+        prompt_chars = sum(len(message["content"]) for message in payload["messages"])
+        model = self.router.choose(mode, prompt_chars)
+        started = time.monotonic()
+        ok = None
+        try:
+            result = await send({**payload, "model": model})
+            ok = True
+            return result
+        except asyncio.CancelledError:
+            # Hedging cancels attempts that were merely slower; only running out of time counts.
+            if time.monotonic() - started >= ATTEMPT_TIMEOUT:
+                ok = False
+            raise
+        except Exception as e:
+            # Errors that aren't the upstream's fault, like a rejected prompt, say nothing about the model,
+            # but one that doesn't exist or was withdrawn must stop getting picked.
+            if is_retryable(e) or is_model_error(e):
+                ok = False
+            raise
+        finally:
+            if ok is not None:
+                self.router.record(model, time.monotonic() - started, ok)
+
+    async def _check_models(self) -> None:
+        """Drop candidate models the AI proxy doesn't list, so a typo or a withdrawn model never gets picked."""
+        try:
+            async with self.session.get(MODELS_URL, headers=API_HEADERS, timeout=MODELS_TIMEOUT) as response:
+                await raise_for_status(response)
+                available = {model["id"] for model in (await response.json())["data"]}
+        except (aiohttp.ClientError, TimeoutError, KeyError, TypeError, ValueError) as e:
+            self.logger.warning("Could not list the AI proxy's models, keeping every candidate: %s", e)
+            return
+        if dropped := self.router.restrict(available):
+            self.logger.warning("The AI proxy doesn't serve %s, not routing to them.", ", ".join(dropped))
+
+    async def _probe_upstream(self) -> bool:
+        """Check whether the AI proxy is answering again, without spending any quota."""
+        async with self.session.get(MODELS_URL, headers=API_HEADERS) as response:
+            return response.status < 500
+
+    async def _stream_completion(
+        self, payload: dict, on_delta: Callable[[str], Awaitable[None]]
+    ) -> str:
+        """POST a streaming `payload` and hand every content delta to `on_delta` as it arrives."""
+        content = []
+        # Only waiting for the response headers is bounded here; once tokens flow, the stream
+        # may take as long as it needs, within the socket read timeout.
+        async with asyncio.timeout(ATTEMPT_TIMEOUT):
+            response = await self.session.post(
+                URL, json=payload, headers=API_HEADERS, timeout=REQUEST_TIMEOUT
+            )
+        async with response:
+            await raise_for_status(response)
+            async for delta in iter_sse_content(response):
+                content.append(delta)
+                await on_delta(delta)
+        return "".join(content)
+
+    @tasks.loop(minutes=5)
+    async def prune_conversations(self) -> None:
+        """Periodically drop idle conversations."""
+        if pruned := self.conversations.prune():
+            self.logger.info(f"Dropped {pruned} idle AI conversations.")
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_usage(self) -> None:
+        """Periodically persist the usage counters."""
+        await self.quota.flush()
+
+    async def _charge_usage(self, interaction: discord.Interaction) -> None:
+        """Count one API call against the limits, raising `UsageLimitReached` if one has been reached."""
+        guild_id = interaction.guild.id if interaction.guild else None
+        if denial := self.quota.try_acquire(interaction.user.id, guild_id):
+            raise UsageLimitReached(denial, interaction)
+        if self.quota.pending_writes >= FLUSH_BATCH:
+            task = asyncio.create_task(self.quota.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _coalesced(
+        self, interaction: discord.Interaction, payload: dict, leader: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Run `leader` for `payload`, or share the result of an identical request already in flight.
+
+        The caller's own limits are checked before joining another request. If the leader is turned
+        away by a limit of its own, the followers don't inherit that: they try again, leading
+        their own request if nobody else has started one.
+        """
+        guild_id = interaction.guild.id if interaction.guild else None
+        while True:
+            if denial := self.quota.check(interaction.user.id, guild_id):
+                raise UsageLimitReached(denial, interaction)
+            try:
+                return await self.inflight.do(payload_key(payload), leader)
+            except UsageLimitReached as e:
+                if e.interaction is interaction:
+                    raise
+
+    def _slot(self, lane: str, interaction: discord.Interaction):
+        """Wait for a scheduler slot in `lane`, telling the user their queue position if they have to wait."""
+        guild_id = interaction.guild.id if interaction.guild else None
+
+        async def notify_queued(position: int) -> None:
+            interaction.extras[QUEUE_NOTICE] = True
+            await interaction.edit_original_response(
+                content=f":hourglass: The AI is busy, your request is queued at position {position}."
+            )
+
+        return self.scheduler.slot(lane, guild_id, interaction.user.id, notify_queued)
+
+    async def _reply(
+        self,
+        interaction: discord.Interaction,
+        content: str | None = None,
+        *,
+        file: discord.File | None = None,
+        view: discord.ui.View | None = None,
+    ) -> discord.Message | None:
+        """Send the result of a deferred command, replacing the queue notice if one is showing."""
+        extra = {"view": view} if view else {}
+        if interaction.extras.pop(QUEUE_NOTICE, False):
+            return await interaction.edit_original_response(
+                content=content, attachments=[file] if file else [], **extra
+            )
+        elif file:
+            return await interaction.followup.send(content, file=file, wait=True, **extra)
+        else:
+            return await interaction.followup.send(content, wait=True, **extra)
+
+    async def _send_answer(self, interaction: discord.Interaction, content: str) -> None:
+        """Send a complete answer, as pages with buttons if it doesn't fit in one message."""
+        pages = paginate(content)
+        if len(pages) == 1:
+            await self._reply(interaction, content)
+            return
+
+        pager = self.pagers.create(content, pages)
+        pager.message = await self._reply(interaction, pager.render(), view=pager)
+
+    async def _download_image(self, payload: dict) -> BinaryIO:
+        """
+        Request an image and decode it from the response as it streams in.
+
+        The image ends up in a spooled buffer that only moves to disk once it gets large,
+        instead of going through several full in-memory copies of the JSON and base64 text.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            async with self.session.post(
+                URL, json=payload, headers=API_HEADERS, timeout=REQUEST_TIMEOUT
+            ) as response:
+                await raise_for_status(response)
+                extractor = DataURIExtractor(buffer)
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    extractor.feed(chunk)
+                extractor.close()
+        except BaseException:
+            buffer.close()
+            raise
+
+        if not extractor.found:
+            buffer.close()
+            raise NoImageReturned(extractor.summary(response.status))
+        self.logger.info(
+            "Decoded a %d byte %s image from the API response.", extractor.size, extractor.mime_type
+        )
+        return buffer
+
+    async def _generate_image(
+        self, interaction: discord.Interaction, key: str, payload: dict
+    ) -> Path:
+        """
+        Charge one use, generate an image and store it in the image cache.
+
+        Only the leader of a coalesced request runs this; everyone gets the cached file's path.
+        """
+        async with self._slot("image", interaction):
+            await self._charge_usage(interaction)
+            buffer = await self.image_upstream.call(
+                # Not hedged: a duplicate image generation costs far more than waiting on a slow one.
+                lambda: self._routed("image", payload, self._download_image)
+            )
+        with buffer:
+            path = await self.image_cache.put(key, buffer)
+        if self.image_processor:
+            path = await self._shrink_image(key, path)
+        return path
+
+    async def _shrink_image(self, key: str, path: Path) -> Path:
+        """Re-encode a cached image in the process pool, keeping the original if that fails or doesn't help."""
+        try:
+            result = await self.image_processor.process(path)
+        except Exception as e:
+            self.logger.error("Failed to re-encode image %s: %s", path.name, e)
+            return path
+
+        if result is None:
+            self.logger.info("Re-encoding didn't shrink image %s, sending the original.", path.name)
+            return path
+
+        encoded, saved, elapsed = result
+        self.logger.info(
+            "Re-encoded image %s as %s in %.2fs, saving %d bytes.",
+            path.name,
+            encoded.suffix,
+            elapsed,
+            saved,
+        )
+        return await self.image_cache.adopt(key, encoded)
+
+    async def _complete(
+        self,
+        interaction: discord.Interaction,
+        prompt: str,
+        payload: dict,
+        on_delta: Callable[[str], Awaitable[None]] | None,
+    ) -> str | None:
+        """
+        Charge one use and request a completion, returning its content if there is any.
+
+        Only the leader of a coalesced request runs this, so only the leader is charged.
+        """
+        async with self._slot("text", interaction):
+            await self._charge_usage(interaction)
+
+            if payload["stream"]:
+                streamed = False
+
+                async def feed(delta: str) -> None:
+                    nonlocal streamed
+                    streamed = True
+                    # The streamed answer takes over the original response from the queue notice.
+                    interaction.extras.pop(QUEUE_NOTICE, None)
+                    await on_delta(delta)
+
+                # A stream can only be retried if none of it has been shown to the user yet.
+                content = await self.text_upstream.call(
+                    lambda: self._routed(
+                        "text", payload, lambda routed: self._stream_completion(routed, feed)
+                    ),
+                    apply_deadline=False,
+                    can_retry=lambda _: not streamed,
+                )
+                if not content.strip():
+                    self.logger.error("API streamed no content for prompt '%s'.", prompt)
+                    return None
+                return content
+
+            # Raises ClientResponseError for bad responses (4xx or 5xx)
+            status, result = await self.text_upstream.call(
+                lambda: self._routed("text", payload, self._post_completion), hedge=HEDGE_REQUESTS
+            )
+
+        self.logger.info(
+            "API response for prompt '%s'. Contains choices: %s",
+            prompt,
+            "choices" in result,
+        )
+
+        if result.get("choices") and result["choices"][0]["message"].get("content"):
+            return result["choices"][0]["message"]["content"]
+
+        self.logger.error(
+            "API returned no content for prompt '%s'. Full response summary: %s",
+            prompt,
+            {
+                "status_code": status,
+                "response_keys": list(result.keys()),
+                "choices_present": "choices" in result,
+            },
+        )
+        return None
+
+    @app_commands.command(
+        name="generate-image", description="Generates an image using Nano Banana 3 Pro."
+    )
+    @app_commands.describe(prompt="The prompt.")
+    @app_commands.check(ai_commands_check)
+    async def image_gen(self, interaction: discord.Interaction, prompt: str) -> None:
+        """Generates an image using Nano Banana 3 Pro."""
+        await interaction.response.defer()
+
+        cache_key = self.image_cache.make_key(prompt, IMAGE_MODEL)
+        if (path := self.image_cache.get(cache_key)) is not None:
+            await self._reply(interaction, file=discord.File(path, f"image{path.suffix}"))
+            self.logger.info("Served cached image for prompt: '%s'", prompt)
+            return
+
+        payload = {
+            "model": IMAGE_MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+            "modalities": ["image", "text"],
+            "image_config": {"aspect_ratio": "16:9"},
+        }
+
+        try:
+            path, shared = await self._coalesced(
+                interaction, payload, lambda: self._generate_image(interaction, cache_key, payload)
+            )
+        except (UsageLimitReached, QueueFull, CircuitOpen) as e:
+            await self._reply(interaction, str(e))
+            return
+        except (aiohttp.ClientError, TimeoutError) as e:
+            self.logger.error("Request to AI API failed for prompt '%s': %s", prompt, e)
+            await self._reply(interaction, f"Failed to communicate with the AI API: {e}")
+            return
+        except binascii.Error as e:
+            self.logger.error("Error decoding base64 for prompt '%s': %s", prompt, e)
+            await self._reply(
+                interaction,
+                "I couldn't generate an image. The API returned invalid image data.",
+            )
+            return
+        except NoImageReturned as e:
+            # Log a summary of the API response when no image is found, avoiding large data.
+            self.logger.error(
+                "API returned no image for prompt '%s'. Full response summary: %s",
+                prompt,
+                e.summary,
+            )
+            await self._reply(
+                interaction, "I couldn't generate an image. The API returned no image."
+            )
+            return
+
+        await self._reply(interaction, file=discord.File(path, f"image{path.suffix}"))
+        self.logger.info("Successfully sent image for prompt: '%s'. Shared: %s", prompt, shared)
+
+    async def _answer(
+        self,
+        interaction: discord.Interaction,
+        prompt: str,
+        messages: list[dict],
+        personality: str | None = None,
+    ) -> None:
+        """Send `messages` to the AI proxy and reply to `interaction` with the completion."""
+        # In conversation mode the answer depends on the channel's history, so it can't be cached.
+        conversational = interaction.channel_id in self.conversations
+        cache_key = self.cache.make_key(prompt, TEXT_MODEL, personality)
+        if conversational:
+            messages = messages[:-1] + self.conversations.history(interaction.channel_id) + messages[-1:]
+        elif (cached := await self.cache.get(cache_key)) is not None:
+            await self._send_answer(interaction, cached)
+            self.logger.info("Served cached AI response for prompt: '%s'", prompt)
+            return
+
+        payload = {
+            "model": TEXT_MODEL,
+            "messages": messages,
+            "stream": STREAM_RESPONSES,
+        }
+        reply = StreamingReply(interaction) if STREAM_RESPONSES else None
+
+        try:
+            content, shared = await self._coalesced(
+                interaction,
+                payload,
+                lambda: self._complete(interaction, prompt, payload, reply.feed if reply else None),
+            )
+            if not content:
+                await self._reply(interaction, "I couldn't get a response from the AI.")
+                return
+
+            if reply and not shared:
+                await reply.finish()
+            else:
+                await self._send_answer(interaction, content)
+
+            if conversational:
+                self.conversations.record(interaction.channel_id, prompt, content)
+            elif not shared:
+                await self.cache.set(cache_key, content)
+            self.logger.info(
+                "Successfully sent AI response for prompt: '%s'. Shared: %s", prompt, shared
+            )
+
+        except (UsageLimitReached, QueueFull, CircuitOpen) as e:
+            await self._reply(interaction, str(e))
+        except (aiohttp.ClientError, TimeoutError) as e:
+            self.logger.error("Request to AI API failed for prompt '%s': %s", prompt, e)
+            await self._reply(interaction, f"Failed to communicate with the AI API: {e}")
+        except Exception as e:
+            self.logger.error(
+                "An unexpected error occurred while asking the AI for prompt '%s': %s", prompt, e
+            )
+            await self._reply(interaction, "An unexpected error occurred while asking the AI.")
+
+    @app_commands.command(name="ask-ai", description="Ask AI a question.")
+    @app_commands.describe(prompt="The prompt.")
+    @app_commands.check(ai_commands_check)
+    async def ask_ai(self, interaction: discord.Interaction, prompt: str) -> None:
+        """Ask AI a question."""
+        await interaction.response.defer()
+        await self._answer(interaction, prompt, [{"role": "user", "content": prompt}])
+
+    @app_commands.command(
+        name="ask-ai-with-personality",
+        description="Ask AI a question with a random personality.",
+    )
+    @app_commands.describe(prompt="The prompt.")
+    @app_commands.check(ai_commands_check)
+    async def ask_ai_with_personality(self, interaction: discord.Interaction, prompt: str) -> None:
+        """Ask AI a question with a random personality."""
+        await interaction.response.defer()
+        personality = random.choice(PERSONALITY)
+        messages = [
+            {
+                "role": "system",
+                "content": f"Act like a {personality}",
+            },
+            {"role": "user", "content": prompt},
+        ]
+        await self._answer(interaction, prompt, messages, personality)
+
+    @app_commands.command(
+        name="ai-conversation",
+        description="Turns conversation mode for the AI commands on or off in this channel.",
+    )
+    @app_commands.describe(mode="Start, stop or reset the conversation in this channel.")
+    async def ai_conversation(
+        self,
+        interaction: discord.Interaction,
+        mode: Literal["start", "stop", "reset"],
+    ) -> None:
+        """Turns conversation mode for the AI commands on or off in this channel."""
+        channel_id = interaction.channel_id
+        if mode == "start":
+            self.conversations.start(channel_id)
+            message = (
+                ":speech_balloon: Conversation mode is on. The AI commands will remember what was said "
+                f"in this channel until {CONVERSATION_TTL // 60} minutes pass without a question."
+            )
+        elif mode == "stop":
+            if self.conversations.stop(channel_id):
+                message = ":white_check_mark: Conversation mode is off, the conversation has been forgotten."
+            else:
+                message = ":x: Conversation mode isn't on in this channel."
+        elif self.conversations.reset(channel_id):
+            message = ":white_check_mark: The conversation has been reset."
+        else:
+            message = ":x: Conversation mode isn't on in this channel."
+
+        await interaction.response.send_message(message)
+
+    @app_commands.command(name="ai-models", description="Shows how the AI commands are routing between models.")
+    async def ai_models(self, interaction: discord.Interaction) -> None:
+        """Shows how the AI commands are routing between models."""
+        embed = discord.Embed(title="AI Model Routing", color=discord.Color.blue())
+        for mode, models in self.router.routes.items():
+            lines = []
+            for model in models:
+                stats = self.router.stats[model]
+                p50 = stats.latency.percentile(0.5)
+                p95 = stats.latency.percentile(0.95)
+                latency = f"{p50:.2f}s p50, {p95:.2f}s p95" if p50 is not None else "no samples"
+                lines.append(
+                    f"`{model}`: {latency}, {stats.error_rate:.0%} errors, picked {stats.picks} times"
+                )
+            embed.add_field(name=f"{mode.capitalize()} models", value="\n".join(lines), inline=False)
+
+        if self.router.decisions:
+            recent = [
+                f"<t:{int(decision.at)}:R> {decision.mode} ({decision.prompt_chars} chars) → "
+                f"`{decision.model}`: {decision.reason}"
+                for decision in list(self.router.decisions)[-5:]
+            ]
+            embed.add_field(name="Recent decisions", value="\n".join(recent), inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="ai-stats", description="Shows statistics about the AI commands.")
+    async def ai_stats(self, interaction: discord.Interaction) -> None:
+        """Shows statistics about the AI commands."""
+        embed = discord.Embed(title="AI Statistics", color=discord.Color.blue())
+        embed.add_field(
+            name="Usage",
+            value=f"Today: {self.quota.count}/{self.quota.daily_limit}",
+            inline=False,
+        )
+        embed.add_field(
+            name="Response cache",
+            value=(
+                f"Hits: {self.cache.hits} ({self.cache.disk_hits} from disk)\n"
+                f"Misses: {self.cache.misses}\n"
+                f"Hit rate: {self.cache.hit_rate:.1%}\n"
+                f"Entries: {len(self.cache)}/{self.cache.max_entries}"
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Image cache",
+            value=(
+                f"Hits: {self.image_cache.hits}\n"
+                f"Misses: {self.image_cache.misses}\n"
+                f"Images: {len(self.image_cache)} "
+                f"({self.image_cache.total_bytes / 1024 / 1024:.1f}/"
+                f"{self.image_cache.max_bytes / 1024 / 1024:.0f} MiB)"
+            ),
+            inline=False,
+        )
+        if self.image_processor and self.image_processor.processed:
+            processor = self.image_processor
+            embed.add_field(
+                name="Image re-encoding",
+                value=(
+                    f"Images: {processor.processed}\n"
+                    f"Saved: {processor.bytes_saved / 1024 / 1024:.1f} MiB\n"
+                    f"Encode time: {processor.encode_time / processor.processed:.2f}s avg"
+                ),
+                inline=False,
+            )
+        embed.add_field(
+            name="Conversations",
+            value=f"Active: {len(self.conversations)}, expired: {self.conversations.evicted}",
+            inline=False,
+        )
+        embed.add_field(
+            name="Paged answers",
+            value=(
+                f"Active: {len(self.pagers)}/{self.pagers.max_pagers}\n"
+                f"Created: {self.pagers.created}, expired early: {self.pagers.evicted}"
+            ),
+            inline=False,
+        )
+        embed.add_field(
+            name="Request coalescing",
+            value=(
+                f"Upstream calls: {self.inflight.leaders}\n"
+                f"Coalesced: {self.inflight.coalesced}\n"
+                f"In flight: {len(self.inflight)}"
+            ),
+            inline=False,
+        )
+        for lane in self.scheduler.lanes.values():
+            average_wait = sum(lane.waits) / len(lane.waits) if lane.waits else 0.0
+            embed.add_field(
+                name=f"{lane.name.capitalize()} queue",
+                value=(
+                    f"Active: {lane.active}/{lane.concurrency}\n"
+                    f"Queued: {lane.depth}/{lane.max_queue}\n"
+                    f"Wait: {average_wait:.2f}s avg, {max(lane.waits, default=0.0):.2f}s max\n"
+                    f"Served: {lane.served}, rejected: {lane.rejected}"
+                ),
+                inline=True,
+            )
+        for name, upstream in (("Text", self.text_upstream), ("Image", self.image_upstream)):
+            p50 = upstream.latency.percentile(0.5)
+            p95 = upstream.latency.percentile(0.95)
+            latency = f"{p50:.2f}s p50, {p95:.2f}s p95" if p50 is not None else "No samples yet"
+            embed.add_field(
+                name=f"{name} upstream",
+                value=(
+                    f"Latency: {latency}\n"
+                    f"Attempts: {upstream.attempts}, retries: {upstream.retries}\n"
+                    f"Hedges: {upstream.hedges} ({upstream.hedge_wins} won)\n"
+                    f"Short-circuited: {upstream.short_circuited}"
+                ),
+                inline=True,
+            )
+        embed.add_field(
+            name="Circuit breaker",
+            value=f"State: {self.breaker.state}, opened {self.breaker.times_opened} times",
+            inline=False,
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AI(bot))
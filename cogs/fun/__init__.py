@@ -0,0 +1 @@
+# This file makes the fun directory a package.
@@ -0,0 +1,261 @@
+import asyncio
+import heapq
+import logging
+import random
+import sqlite3
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+import discord
+
+PENGUIN_DB = Path("data/penguin.db")
+# Hunts claimed by this process, remembered so concurrent clicks can't both win.
+MAX_CLAIMED = 10_000
+
+logger = logging.getLogger(__name__)
+
+
+class IndexedSet:
+    """A set of ids that also supports picking a random member in O(1)."""
+
+    __slots__ = ("_items", "_positions")
+
+    def __init__(self):
+        self._items: list[int] = []
+        self._positions: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: int) -> bool:
+        return item in self._positions
+
+    def add(self, item: int) -> None:
+        if item not in self._positions:
+            self._positions[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item: int) -> None:
+        if (position := self._positions.pop(item, None)) is None:
+            return
+        # Move the last item into the gap, so removal doesn't shift the whole list.
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> int:
+        return random.choice(self._items)
+
+
+class ChannelIndex:
+    """
+    The channels of each guild the penguin can hide in: public text channels that aren't ignored.
+
+    A guild's set is built the first time it is needed. After that it is kept up to date from
+    channel and role events instead of resolving every channel's permissions on each use.
+    """
+
+    def __init__(self, ignored: set[int]):
+        self.ignored = ignored
+        self._guilds: dict[int, IndexedSet] = {}
+
+    def is_eligible(self, channel: discord.abc.GuildChannel) -> bool:
+        return (
+            isinstance(channel, discord.TextChannel)
+            and channel.id not in self.ignored
+            and channel.permissions_for(channel.guild.default_role).read_messages
+        )
+
+    def channels(self, guild: discord.Guild) -> IndexedSet:
+        if (channels := self._guilds.get(guild.id)) is None:
+            channels = self._guilds[guild.id] = IndexedSet()
+            for channel in guild.text_channels:
+                if self.is_eligible(channel):
+                    channels.add(channel.id)
+        return channels
+
+    def pick(self, guild: discord.Guild) -> discord.TextChannel | None:
+        """Pick a random eligible channel, or None if the guild has none."""
+        channels = self.channels(guild)
+        while channels:
+            channel = guild.get_channel(channel_id := channels.choice())
+            if channel is not None:
+                return channel
+            # Missed a delete event, e.g. while disconnected.
+            channels.discard(channel_id)
+        return None
+
+    def update(self, channel: discord.abc.GuildChannel) -> None:
+        """Re-check a created or edited channel, and the channels synced to it if it's a category."""
+        if (channels := self._guilds.get(channel.guild.id)) is None:
+            return  # Not built yet; it will be up to date when it is.
+
+        to_check = channel.text_channels if isinstance(channel, discord.CategoryChannel) else [channel]
+        for child in to_check:
+            if self.is_eligible(child):
+                channels.add(child.id)
+            else:
+                channels.discard(child.id)
+
+    def remove(self, channel: discord.abc.GuildChannel) -> None:
+        if (channels := self._guilds.get(channel.guild.id)) is not None:
+            channels.discard(channel.id)
+
+    def invalidate(self, guild: discord.Guild) -> None:
+        """Forget a guild's channels, e.g. after @everyone's permissions changed, to rebuild them when needed."""
+        self._guilds.pop(guild.id, None)
+
+
+class PenguinButton(discord.ui.DynamicItem[discord.ui.Button], template=r"penguin:found:(?P<hunt_id>[0-9]+)"):
+    """
+    The "I found the penguin!" button.
+
+    It is routed by its custom id, which carries the hunt's id, instead of living in a view
+    object, so buttons on penguins sent before a restart keep working.
+    """
+
+    def __init__(self, hunt_id: int):
+        super().__init__(
+            discord.ui.Button(
+                label="I found the penguin!",
+                style=discord.ButtonStyle.primary,
+                emoji="🐧",
+                custom_id=f"penguin:found:{hunt_id}",
+            )
+        )
+        self.hunt_id = hunt_id
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Button, match
+    ) -> "PenguinButton":
+        return cls(int(match["hunt_id"]))
+
+    @staticmethod
+    def view(hunt_id: int) -> discord.ui.View:
+        view = discord.ui.View(timeout=None)
+        view.add_item(PenguinButton(hunt_id))
+        return view
+
+    @staticmethod
+    def found_view() -> discord.ui.View:
+        view = discord.ui.View(timeout=None)
+        view.add_item(
+            discord.ui.Button(label="Found!", style=discord.ButtonStyle.primary, emoji="🐧", disabled=True)
+        )
+        # Nothing ever clicks it, and a finished view isn't kept in the client's view store.
+        view.stop()
+        return view
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        cog = interaction.client.get_cog("Fun")
+        if cog is None:
+            await interaction.response.send_message(":x: The penguin game isn't available right now.", ephemeral=True)
+            return
+        await cog.penguin_found(interaction, self.hunt_id)
+
+
+class PenguinStore:
+    """
+    Records penguin finds in SQLite, with the leaderboard aggregates kept in memory.
+
+    Finds are queued and written in batches, along with the per-user totals they add to, so a
+    leaderboard never scans the raw finds. The totals are loaded once when the store opens.
+    A hunt's id is the snowflake of the command that hid it, so it also records when it was hidden.
+    """
+
+    def __init__(self, path: Path = PENGUIN_DB, batch_size: int = 20):
+        self.path = path
+        self.batch_size = batch_size
+
+        self._db: sqlite3.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._pending: list[tuple[int, int, int, int, float]] = []
+        self._claimed: OrderedDict[int, None] = OrderedDict()
+        # guild id -> user id -> [finds, fastest find in seconds]
+        self.totals: defaultdict[int, dict[int, list]] = defaultdict(dict)
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS finds (
+                hunt_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                seconds REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS finders (
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                finds INTEGER NOT NULL,
+                fastest REAL NOT NULL,
+                PRIMARY KEY (guild_id, user_id)
+            );
+            """
+        )
+        for guild_id, user_id, finds, fastest in self._db.execute("SELECT * FROM finders"):
+            self.totals[guild_id][user_id] = [finds, fastest]
+
+    async def claim(self, hunt_id: int) -> bool:
+        """Claim a hunt for the first person to click it. Returns False if it was already found."""
+        if hunt_id in self._claimed:
+            return False
+        self._claimed[hunt_id] = None
+        while len(self._claimed) > MAX_CLAIMED:
+            self._claimed.popitem(last=False)
+
+        # It may have been found before a restart.
+        async with self._lock:
+            row = await asyncio.to_thread(
+                lambda: self._db.execute("SELECT 1 FROM finds WHERE hunt_id = ?", (hunt_id,)).fetchone()
+            )
+        return row is None
+
+    def record(self, hunt_id: int, guild_id: int, channel_id: int, user_id: int, seconds: float) -> None:
+        totals = self.totals[guild_id].setdefault(user_id, [0, seconds])
+        totals[0] += 1
+        totals[1] = min(totals[1], seconds)
+        self._pending.append((hunt_id, guild_id, channel_id, user_id, seconds))
+
+    def leaderboard(self, guild_id: int, limit: int = 10) -> list[tuple[int, int, float]]:
+        """The top finders of a guild, as (user id, finds, fastest find) tuples."""
+        top = heapq.nlargest(limit, self.totals[guild_id].items(), key=lambda item: (item[1][0], -item[1][1]))
+        return [(user_id, finds, fastest) for user_id, (finds, fastest) in top]
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to save {len(batch)} penguin finds: {e}")
+                self._pending = batch + self._pending
+
+    def _write(self, batch: list[tuple[int, int, int, int, float]]) -> None:
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO finds VALUES (?, ?, ?, ?, ?)", batch)
+            self._db.executemany(
+                """
+                INSERT INTO finders VALUES (?, ?, 1, ?)
+                ON CONFLICT (guild_id, user_id) DO UPDATE SET
+                    finds = finds + 1,
+                    fastest = min(fastest, excluded.fastest)
+                """,
+                [(guild_id, user_id, seconds) for _, guild_id, _, user_id, seconds in batch],
+            )
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._db:
+            self._db.close()
+            self._db = None
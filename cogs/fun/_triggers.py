@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+TRIGGERS_FILE = Path("data/triggers.json")
+MAX_TRIGGERS_PER_GUILD = 2000
+MAX_TRIGGER_LENGTH = 100
+WORD = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Trigger:
+    word: str
+    # Only match the word on its own, not inside another word.
+    whole_word: bool = True
+    case_sensitive: bool = False
+    # What to reply with; defaults to "<word> detected".
+    response: str | None = None
+
+    @property
+    def key(self) -> str:
+        return self.word if self.case_sensitive else self.word.casefold()
+
+    @property
+    def reply(self) -> str:
+        return self.response or f"{self.word} detected"
+
+
+def trie_pattern(words: list[str]) -> str:
+    """
+    Build a regex alternation of `words` that shares common prefixes, like "dr(?:agon|ake)".
+
+    The regex engine then walks the words like a trie instead of trying every alternative in turn,
+    so the cost of a match barely grows with the number of words. Longer words are preferred over
+    their prefixes.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{pattern})?"
+        return pattern
+
+    return build(trie)
+
+
+class TriggerMatcher:
+    """
+    Finds the first trigger in a message.
+
+    Most triggers are single whole words, which are looked up in a set against the words of the
+    message, at a cost that stays flat however many there are. Phrases and substring triggers are
+    compiled into a trie-shaped regex, whose cost still grows with their number, but much more
+    slowly than scanning for each of them. Case-insensitive
+    triggers are matched against the casefolded message and case-sensitive ones against the
+    message as is, so each message is searched at most twice per kind.
+    """
+
+    def __init__(self, triggers: list[Trigger]):
+        self.triggers = {trigger.key: trigger for trigger in triggers}
+
+        self._words: dict[bool, frozenset[str]] = {}
+        self._patterns: dict[bool, re.Pattern | None] = {}
+        for case_sensitive in (False, True):
+            group = [t for t in triggers if t.case_sensitive == case_sensitive]
+            words = {t.key for t in group if t.whole_word and WORD.fullmatch(t.key)}
+            self._words[case_sensitive] = frozenset(words)
+            self._patterns[case_sensitive] = self._compile(
+                [t.key for t in group if t.whole_word and t.key not in words],
+                [t.key for t in group if not t.whole_word],
+            )
+
+    @staticmethod
+    def _compile(phrases: list[str], substrings: list[str]) -> re.Pattern | None:
+        alternatives = []
+        if phrases:
+            alternatives.append(rf"(?<!\w){trie_pattern(phrases)}(?!\w)")
+        if substrings:
+            alternatives.append(trie_pattern(substrings))
+        return re.compile("|".join(alternatives)) if alternatives else None
+
+    def _search(self, text: str, case_sensitive: bool) -> tuple[int, str] | None:
+        """Return where the first trigger in `text` starts and its key."""
+        found = None
+        if (pattern := self._patterns[case_sensitive]) and (match := pattern.search(text)):
+            found = (match.start(), match.group())
+
+        words = self._words[case_sensitive]
+        if words and not words.isdisjoint(WORD.findall(text)):
+            for match in WORD.finditer(text):
+                if found and match.start() >= found[0]:
+                    break
+                if match.group() in words:
+                    return match.start(), match.group()
+        return found
+
+    def match(self, content: str) -> Trigger | None:
+        matches = [
+            found
+            for text, case_sensitive in ((content.casefold(), False), (content, True))
+            if (found := self._search(text, case_sensitive))
+        ]
+        if not matches:
+            return None
+        # Casefolding can change lengths, but only for rare characters; position is a tiebreak at worst.
+        return self.triggers.get(min(matches)[1])
+
+
+class TriggerStore:
+    """
+    Per-guild trigger lists, persisted to a JSON file.
+
+    Guilds that haven't set their own triggers use `defaults`, and `always` triggers apply
+    everywhere. Each guild's matcher is compiled on first use and only recompiled after that
+    guild edits its list.
+    """
+
+    def __init__(self, defaults: list[Trigger], always: list[Trigger] = (), path: Path = TRIGGERS_FILE):
+        self.defaults = list(defaults)
+        self.always = list(always)
+        self.path = path
+
+        self._guilds: dict[int, list[Trigger]] = {}
+        self._matchers: dict[int | None, TriggerMatcher] = {}
+        self._save_lock = asyncio.Lock()
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text("utf-8"))
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logger.error(f"Failed to read {self.path}, starting with default triggers: {e}")
+            return
+        self._guilds = {
+            int(guild_id): [Trigger(**trigger) for trigger in triggers]
+            for guild_id, triggers in data.items()
+        }
+
+    def triggers(self, guild_id: int | None) -> list[Trigger]:
+        return self._guilds.get(guild_id, self.defaults)
+
+    def matcher(self, guild_id: int | None) -> TriggerMatcher:
+        # Guilds without their own list share the default matcher.
+        key = guild_id if guild_id in self._guilds else None
+        if (matcher := self._matchers.get(key)) is None:
+            matcher = self._matchers[key] = TriggerMatcher(self.always + self.triggers(guild_id))
+        return matcher
+
+    async def add(self, guild_id: int, trigger: Trigger) -> str | None:
+        """Add or replace a trigger. Returns why it couldn't be added, if it couldn't."""
+        triggers = [t for t in self.triggers(guild_id) if t.key != trigger.key]
+        if not trigger.word.strip():
+            return ":x: Triggers can't be empty."
+        if len(trigger.word) > MAX_TRIGGER_LENGTH:
+            return f":x: Triggers can be at most {MAX_TRIGGER_LENGTH} characters long."
+        if len(triggers) >= MAX_TRIGGERS_PER_GUILD:
+            return f":x: This server already has the maximum of {MAX_TRIGGERS_PER_GUILD} triggers."
+        await self._update(guild_id, triggers + [trigger])
+        return None
+
+    async def remove(self, guild_id: int, word: str) -> bool:
+        triggers = self.triggers(guild_id)
+        remaining = [t for t in triggers if t.key != (word if t.case_sensitive else word.casefold())]
+        if len(remaining) == len(triggers):
+            return False
+        await self._update(guild_id, remaining)
+        return True
+
+    async def reset(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
+        self._matchers.pop(guild_id, None)
+        await self._save()
+
+    async def _update(self, guild_id: int, triggers: list[Trigger]) -> None:
+        self._guilds[guild_id] = triggers
+        self._matchers.pop(guild_id, None)
+        await self._save()
+
+    async def _save(self) -> None:
+        data = {
+            str(guild_id): [asdict(trigger) for trigger in triggers]
+            for guild_id, triggers in self._guilds.items()
+        }
+        async with self._save_lock:
+            await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,520 @@
+import asyncio
+import logging
+import random
+from collections import Counter
+from json import loads
+from pathlib import Path
+from typing import Literal
+from zoneinfo import ZoneInfo
+
+import discord
+import pyjokes
+from aiohttp import ClientError, ClientResponseError
+from discord import Embed, app_commands
+from discord.ext import commands, tasks
+
+from utils.daily import DailyCache
+from utils.prefetch import PrefetchBuffer
+from utils.ratelimit import TokenBucketLimiter
+
+from ._penguin import ChannelIndex, PenguinButton, PenguinStore
+from ._triggers import Trigger, TriggerStore
+
+ALL_VIDS = loads(Path("resources/fun/april_fools_vids.json").read_text("utf-8"))
+
+PENGUIN_IGNORED_CHANNELS = {
+    1406104900105932860,
+    1406104898843574370,
+    1406106827342479442,
+    1406104898843574371,
+    1406107819832381632,
+    1406108481781498008,
+    1444870658637959320,
+}
+
+# The triggers of servers that haven't set their own with /triggers.
+TRIGGER_WORDS = [
+    "dragon",
+    "hackclub",
+    "dragonsenseiguy",
+]  # PR's to extend this are welcome!
+# Auto-replies are limited per channel and per user, as (burst, seconds to regain one reply), so a busy
+# channel can't push the bot into Discord's rate limits. Triggers over the limit are counted, not sent.
+CHANNEL_REPLY_LIMIT = (3, 20)
+USER_REPLY_LIMIT = (2, 30)
+# Penguin finds are written to the database every PENGUIN_FLUSH_INTERVAL seconds, or once
+# PENGUIN_FLUSH_BATCH of them have piled up.
+PENGUIN_FLUSH_INTERVAL = 30
+PENGUIN_FLUSH_BATCH = 20
+SECRET_TRIGGER = Trigger(
+    "dragonsenseiguy is the best person in the world",
+    response=(
+        "Access granted, You have been promoted to Administrator role. "
+        "You are one of the few people who actually read the source code!"
+    ),
+)
+
+
+async def respond(interaction: discord.Interaction, content: str | None = None, **kwargs) -> None:
+    """Reply to `interaction`, with a followup if it has been deferred."""
+    if interaction.response.is_done():
+        await interaction.followup.send(content, **kwargs)
+    else:
+        await interaction.response.send_message(content, **kwargs)
+
+
+class Fun(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # The random-content commands are answered from these, so they don't wait on the APIs.
+        self.dad_jokes = PrefetchBuffer("dad jokes", self._fetch_dad_jokes, key=lambda joke: joke["id"])
+        self.dog_pictures = PrefetchBuffer("dog pictures", self._fetch_dog_pictures)
+        self.cat_pictures = PrefetchBuffer("cat pictures", self._fetch_cat_pictures)
+        self.random_quotes = PrefetchBuffer(
+            "quotes", self._fetch_quotes, low_water=5, high_water=20, key=lambda quote: quote["q"]
+        )
+        self.buffers = (self.dad_jokes, self.dog_pictures, self.cat_pictures, self.random_quotes)
+        self.triggers = TriggerStore([Trigger(word) for word in TRIGGER_WORDS], always=[SECRET_TRIGGER])
+        self.channel_replies = TokenBucketLimiter(1 / CHANNEL_REPLY_LIMIT[1], CHANNEL_REPLY_LIMIT[0])
+        self.user_replies = TokenBucketLimiter(1 / USER_REPLY_LIMIT[1], USER_REPLY_LIMIT[0])
+        self.suppressed_replies: Counter[int | None] = Counter()
+        self._reply_tasks: set[asyncio.Task] = set()
+        self.penguin_channels = ChannelIndex(PENGUIN_IGNORED_CHANNELS)
+        self.penguins = PenguinStore(batch_size=PENGUIN_FLUSH_BATCH)
+        # zenquotes picks a new quote of the day at midnight US Central time.
+        self.daily_quote = DailyCache("zenquotes_today", self._fetch_daily_quote, tz=ZoneInfo("America/Chicago"))
+
+    async def cog_load(self) -> None:
+        await asyncio.to_thread(self.triggers.load)
+        await asyncio.to_thread(self.penguins.open)
+        self.bot.add_dynamic_items(PenguinButton)
+        self.flush_penguins.start()
+        for buffer in self.buffers:
+            buffer.start()
+
+    async def cog_unload(self) -> None:
+        for buffer in self.buffers:
+            buffer.close()
+        for task in self._reply_tasks:
+            task.cancel()
+        self.bot.remove_dynamic_items(PenguinButton)
+        self.flush_penguins.cancel()
+        await self.penguins.close()
+
+    @tasks.loop(seconds=PENGUIN_FLUSH_INTERVAL)
+    async def flush_penguins(self) -> None:
+        """Periodically save penguin finds."""
+        await self.penguins.flush()
+
+    async def _get_json(self, url: str, **kwargs):
+        response = await self.bot.http_client.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_dad_jokes(self) -> list[dict]:
+        # Random endpoints give a different answer every time, so they skip the HTTP cache.
+        return [
+            await self._get_json("https://icanhazdadjoke.com", headers={"Accept": "application/json"}, cache=False)
+        ]
+
+    async def _fetch_dog_pictures(self) -> list[str]:
+        data = await self._get_json("https://dog.ceo/api/breeds/image/random/5", cache=False)
+        return data["message"]
+
+    async def _fetch_cat_pictures(self) -> list[str]:
+        data = await self._get_json("https://api.thecatapi.com/v1/images/search", params={"limit": 5}, cache=False)
+        return [image["url"] for image in data]
+
+    async def _fetch_daily_quote(self) -> dict:
+        data = await self._get_json("https://zenquotes.io/api/today")
+        return data[0]
+
+    async def _fetch_quotes(self) -> list[dict]:
+        # zenquotes hands out 50 random quotes per call, so one request fills the buffer.
+        return await self._get_json("https://zenquotes.io/api/quotes", cache=False)
+
+    @app_commands.command(
+        name="joke",
+        description="Retrieves a joke of the specified `category` from the pyjokes api.",
+    )
+    @app_commands.describe(category="The joke category")
+    async def joke(
+        self,
+        ctx: commands.Context,
+        category: Literal["neutral", "chuck", "all"] = "all",
+    ) -> None:
+        """Retrieves a joke of the specified `category` from the pyjokes api."""
+        joke = pyjokes.get_joke(category=category)
+        await ctx.response.send_message(joke)
+
+    @app_commands.command(
+        name="fool", description="Get a random April Fools' video from Youtube."
+    )
+    async def april_fools(self, ctx: commands.Context) -> None:
+        """Get a random April Fools' video from Youtube."""
+        video = random.choice(ALL_VIDS)
+
+        channel, url = video["channel"], video["url"]
+
+        await ctx.response.send_message(
+            f"Check out this April Fools' video by {channel}.\n\n{url}"
+        )
+
+    @app_commands.command(
+        name="quote",
+        description="Retrieves a quote from the zenquotes.io api.",
+    )
+    @app_commands.describe(subcommands="Random or daily")
+    async def quote(
+        self,
+        ctx: commands.Context,
+        subcommands: Literal["daily", "random"],
+    ) -> None:
+        """Retrieves a quote from the zenquotes.io api."""
+        if subcommands == "daily":
+            try:
+                # The first request of the day fetches it, which may not make Discord's 3 second deadline.
+                if not self.daily_quote.is_current():
+                    await ctx.response.defer()
+                data = await self.daily_quote.get()
+                quote = f"{data['q']}\n*— {data['a']}*"
+
+                embed = Embed(
+                    title="Daily Quote",
+                    description=f"> {quote}\n\n-# Powered by [zenquotes.io](https://zenquotes.io)",
+                    colour=0x0279FD,
+                )
+                await respond(ctx, embed=embed)
+            except ClientResponseError as e:
+                logging.warning(f"ZenQuotes API error: {e.status} {e.message}")
+                await respond(ctx, ":x: Could not retrieve quote from API.")
+            except (ClientError, TimeoutError) as e:
+                logging.error(f"Network error fetching quote: {e}")
+                await respond(ctx, ":x: Could not connect to the quote service.")
+            except Exception:
+                logging.exception("Unexpected error fetching quote.")
+                await respond(ctx, ":x: Something unexpected happened. Try again later.")
+        if subcommands == "random":
+            try:
+                if not self.random_quotes:
+                    await ctx.response.defer()
+                data = await self.random_quotes.get()
+                quote = f"{data['q']}\n*— {data['a']}*"
+
+                embed = Embed(
+                    title="Random Quote",
+                    description=f"> {quote}\n\n-# Powered by [zenquotes.io](https://zenquotes.io)",
+                    colour=0x0279FD,
+                )
+                await respond(ctx, embed=embed)
+            except ClientResponseError as e:
+                logging.warning(f"ZenQuotes API error: {e.status} {e.message}")
+                await respond(ctx, ":x: Could not retrieve quote from API.")
+            except (ClientError, TimeoutError) as e:
+                logging.error(f"Network error fetching quote: {e}")
+                await respond(ctx, ":x: Could not connect to the quote service.")
+            except Exception:
+                logging.exception("Unexpected error fetching quote.")
+                await respond(ctx, ":x: Something unexpected happened. Try again later.")
+
+    @app_commands.command(
+        name="penguin-hide-and-seek",
+        description="Bot pops up in a random channel until someone marks that they spotted it.",
+    )
+    @app_commands.describe()
+    async def penguin_hide_and_seek(
+        self,
+        ctx: commands.Context,
+    ) -> None:
+        """Bot pops up in a random channel until someone marks that they spotted it."""
+        if not ctx.guild:
+            await ctx.response.send_message("This command can only be used in a guild.")
+            return
+
+        random_channel = self.penguin_channels.pick(ctx.guild)
+        if random_channel is None:
+            return await ctx.response.send_message(
+                "No public text channels found in this guild where I can send the message."
+            )
+
+        # The command's id identifies the hunt, and says when the penguin was hidden.
+        await random_channel.send("A wild penguin has appeared! 🐧", view=PenguinButton.view(ctx.id))
+        await ctx.response.send_message(
+            f"I sent a message to {random_channel.mention}."
+        )
+
+    async def penguin_found(self, interaction: discord.Interaction, hunt_id: int) -> None:
+        """Handle a click on a penguin's button, which only the first finder gets credit for."""
+        if not await self.penguins.claim(hunt_id):
+            await interaction.response.send_message("Someone already found this penguin!", ephemeral=True)
+            return
+
+        await interaction.response.edit_message(view=PenguinButton.found_view())
+        await interaction.followup.send(f"{interaction.user.mention} found the penguin!")
+
+        seconds = (discord.utils.utcnow() - discord.utils.snowflake_time(hunt_id)).total_seconds()
+        self.penguins.record(hunt_id, interaction.guild_id, interaction.channel_id, interaction.user.id, seconds)
+        if self.penguins.pending_writes >= PENGUIN_FLUSH_BATCH:
+            await self.penguins.flush()
+
+    @app_commands.command(
+        name="penguin-leaderboard",
+        description="Shows who has found the most penguins in this server.",
+    )
+    @app_commands.guild_only()
+    async def penguin_leaderboard(self, interaction: discord.Interaction) -> None:
+        """Shows who has found the most penguins in this server."""
+        top = self.penguins.leaderboard(interaction.guild_id)
+        if not top:
+            await interaction.response.send_message("Nobody has found a penguin here yet. 🐧")
+            return
+
+        lines = [
+            f"**{rank}.** <@{user_id}>: {finds} found, fastest in {fastest:.1f}s"
+            for rank, (user_id, finds, fastest) in enumerate(top, start=1)
+        ]
+        embed = Embed(title="🐧 Penguin Leaderboard", description="\n".join(lines), colour=0x0279FD)
+        await interaction.response.send_message(embed=embed)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        self.penguin_channels.update(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ) -> None:
+        self.penguin_channels.update(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self.penguin_channels.remove(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        # Only @everyone decides which channels are public.
+        if after.is_default() and before.permissions != after.permissions:
+            self.penguin_channels.invalidate(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.penguin_channels.invalidate(guild)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author == self.bot.user:
+            return
+
+        guild_id = message.guild.id if message.guild else None
+        if trigger := self.triggers.matcher(guild_id).match(message.content):
+            # Both buckets are checked before either is spent, so a muted user doesn't use up the channel's.
+            if not (
+                self.channel_replies.available(message.channel.id)
+                and self.user_replies.available(message.author.id)
+            ):
+                self.suppressed_replies[guild_id] += 1
+                return
+            self.channel_replies.try_acquire(message.channel.id)
+            self.user_replies.try_acquire(message.author.id)
+
+            # Sent in the background, so the listener never waits on Discord's message rate limits.
+            task = asyncio.create_task(self._auto_reply(message, trigger.reply))
+            self._reply_tasks.add(task)
+            task.add_done_callback(self._reply_tasks.discard)
+            return
+
+        await self.bot.process_commands(message)
+
+    async def _auto_reply(self, message: discord.Message, content: str) -> None:
+        try:
+            await message.reply(content)
+        except discord.HTTPException as e:
+            logging.warning(f"Failed to send an auto-reply in channel {message.channel.id}: {e}")
+
+    @app_commands.command(
+        name="triggers",
+        description="Lists or edits the words the bot replies to in this server.",
+    )
+    @app_commands.describe(
+        action="What to do with the trigger list",
+        word="The word or phrase to add or remove",
+        whole_word="Only trigger on the word on its own, not inside other words",
+        case_sensitive="Only trigger when the case matches exactly",
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def triggers_command(
+        self,
+        interaction: discord.Interaction,
+        action: Literal["list", "add", "remove", "reset"],
+        word: str | None = None,
+        whole_word: bool = True,
+        case_sensitive: bool = False,
+    ) -> None:
+        """Lists or edits the words the bot replies to in this server."""
+        guild_id = interaction.guild.id
+        if action in ("add", "remove") and not word:
+            await interaction.response.send_message(f":x: Tell me which word to {action}.", ephemeral=True)
+            return
+
+        if action == "add":
+            trigger = Trigger(word, whole_word=whole_word, case_sensitive=case_sensitive)
+            if error := await self.triggers.add(guild_id, trigger):
+                message = error
+            else:
+                message = f":white_check_mark: Added the trigger `{word}`."
+        elif action == "remove":
+            if await self.triggers.remove(guild_id, word):
+                message = f":white_check_mark: Removed the trigger `{word}`."
+            else:
+                message = f":x: `{word}` isn't a trigger in this server."
+        elif action == "reset":
+            await self.triggers.reset(guild_id)
+            message = ":white_check_mark: This server is back to the default triggers."
+        else:
+            triggers = self.triggers.triggers(guild_id)
+            lines = []
+            for trigger in triggers:
+                line = f"`{trigger.word}`"
+                if not trigger.whole_word:
+                    line += " (inside words too)"
+                if trigger.case_sensitive:
+                    line += " (case sensitive)"
+                lines.append(line)
+            message = f"**{len(triggers)} triggers:** " + ", ".join(lines) if lines else "This server has no triggers."
+            if suppressed := self.suppressed_replies[guild_id]:
+                message = f"{suppressed} replies were held back by the rate limit.\n{message}"
+            if len(message) > 2000:
+                message = message[:1997] + "..."
+
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @app_commands.command(
+        name="rock-paper-scissors",
+        description="Play rock paper scissors with the bot.",
+    )
+    @app_commands.describe(choice="Rock, Paper or Scissors?")
+    async def rock_paper_scissors(
+            self,
+            ctx: commands.Context,
+            choice: Literal["Rock", "Paper", "Scissors"],
+    ) -> None:
+        """Play rock paper scissors with the bot."""
+        bot_choice = random.choice(["Rock", "Paper", "Scissors"])
+        if bot_choice == choice:
+            result = "tied"
+        elif bot_choice == "Rock" and choice == "Paper":
+            result = "won"
+        elif bot_choice == "Rock" and choice == "Scissors":
+            result = "lost"
+        elif bot_choice == "Paper" and choice == "Rock":
+            result = "lost"
+        elif bot_choice == "Paper" and choice == "Scissors":
+            result = "won"
+        elif bot_choice == "Scissors" and choice == "Rock":
+            result = "won"
+        elif bot_choice == "Scissors" and choice == "Paper":
+            result = "lost"
+        else:
+            logging.error(f"An unexpected error occured with rock, paper and scissors. User choice: {choice}. Bot choice: {bot_choice}")
+        await ctx.response.send_message(f"You chose {choice} and the bot chose {bot_choice}, you {result}")
+
+    @app_commands.command(
+        name="dadjoke",
+        description="Retrieves a random dad joke from icanhazdadjoke.com api.",
+    )
+    @app_commands.describe()
+    async def dad_joke(
+            self,
+            ctx: commands.Context,
+    ) -> None:
+        """Retrieves a random dad joke from icanhazdadjoke.com api."""
+        try:
+            # An empty buffer means fetching live, which may not make Discord's 3 second deadline.
+            if not self.dad_jokes:
+                await ctx.response.defer()
+            data = await self.dad_jokes.get()
+
+            embed = Embed(
+                title="Random Dad Joke",
+                description=f"{data["joke"]}\n\n-# [Permalink](https://icanhazdadjoke.com/j/{data['id']})\n-# Powered by [icanhazdadjoke.com](https://icanhazdadjoke.com/api)",
+                colour=0x0279FD,
+            )
+            await respond(ctx, embed=embed)
+        except ClientResponseError as e:
+            logging.warning(f"icanhazdadjoke API error: {e.status} {e.message}")
+            await respond(ctx, ":x: Could not retrieve dad joke from API.")
+        except (ClientError, TimeoutError) as e:
+            logging.error(f"Network error fetching quote: {e}")
+            await respond(ctx, ":x: Could not connect to the dad joke service.")
+        except Exception:
+            logging.exception("Unexpected error fetching dad joke.")
+            await respond(ctx, ":x: Something unexpected happened. Try again later.")
+
+    @app_commands.command(
+        name="dog-picture",
+        description="Retrieves a dog picture from dog.ceo api.",
+    )
+    @app_commands.describe()
+    async def dog_picture(
+            self,
+            ctx: commands.Context,
+    ) -> None:
+        """Retrieves a dog picture from dog.ceo api."""
+        try:
+            if not self.dog_pictures:
+                await ctx.response.defer()
+            url = await self.dog_pictures.get()
+
+            embed = Embed(
+                title="Random Dog Picture",
+                description=f"-# Powered by [dog.ceo](https://dog.ceo)",
+                colour=0x0279FD,
+            )
+            embed.set_image(url=url)
+            await respond(ctx, embed=embed)
+        except ClientResponseError as e:
+            logging.warning(f"dog.ceo API error: {e.status} {e.message}")
+            await respond(ctx, ":x: Could not retrieve dog picture from API.")
+        except (ClientError, TimeoutError) as e:
+            logging.error(f"Network error fetching dog picture: {e}")
+            await respond(ctx, ":x: Could not connect to the dog picture service.")
+        except Exception:
+            logging.exception("Unexpected error fetching dog picture.")
+            await respond(ctx, ":x: Something unexpected happened. Try again later.")
+
+    @app_commands.command(
+        name="cat-picture",
+        description="Retrieves a cat picture from thecatapi.com api.",
+    )
+    @app_commands.describe()
+    async def cat_picture(
+            self,
+            ctx: commands.Context,
+    ) -> None:
+        """Retrieves a cat picture from thecatapi.com api."""
+        try:
+            if not self.cat_pictures:
+                await ctx.response.defer()
+            url = await self.cat_pictures.get()
+
+            embed = Embed(
+                title="Random Cat Picture",
+                description=f"-# Powered by [thecatapi.com](https://thecatapi.com)",
+                colour=0x0279FD,
+            )
+            embed.set_image(url=url)
+            await respond(ctx, embed=embed)
+        except ClientResponseError as e:
+            logging.warning(f"thecatapi.com API error: {e.status} {e.message}")
+            await respond(ctx, ":x: Could not retrieve cat picture from API.")
+        except (ClientError, TimeoutError) as e:
+            logging.error(f"Network error fetching cat picture: {e}")
+            await respond(ctx, ":x: Could not connect to the cat picture service.")
+        except Exception:
+            logging.exception("Unexpected error fetching cat picture.")
+            await respond(ctx, ":x: Something unexpected happened. Try again later.")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Fun(bot))
@@ -28,6 +28,42 @@ class Miscellaneous(commands.Cog):
 
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="http-stats", description="Shows how the bot's outbound HTTP requests are doing.")
+    async def http_stats(self, interaction: discord.Interaction) -> None:
+        """Shows how the bot's outbound HTTP requests are doing."""
+        embed = Embed(title="HTTP Statistics", color=discord.Color.blue())
+
+        hosts = sorted(self.bot.http_client.hosts.items(), key=lambda item: item[1].requests, reverse=True)
+        for host, stats in hosts[:15]:
+            p50 = stats.percentile(0.5)
+            p95 = stats.percentile(0.95)
+            latency = f"{p50 * 1000:.0f} ms p50, {p95 * 1000:.0f} ms p95" if p50 is not None else "No samples yet"
+            embed.add_field(
+                name=host,
+                value=f"Requests: {stats.requests}, errors: {stats.errors}\n{latency}",
+                inline=False,
+            )
+
+        cache = self.bot.http_client.cache
+        for source, stats in list(cache.sources.items())[:10]:
+            embed.add_field(
+                name=f"{source} (cache)",
+                value=(
+                    f"Hits: {stats.hits}, stale: {stats.stale_hits}, revalidated: {stats.revalidated}, "
+                    f"misses: {stats.misses}\n"
+                    f"Saved {stats.bytes_saved / 1024:.1f} KiB, about {stats.time_saved:.1f} s"
+                ),
+                inline=False,
+            )
+        embed.set_footer(
+            text=f"Disk cache: {len(cache)} responses, {cache.total_bytes / 2**20:.1f} of {cache.max_bytes / 2**20:.0f} MiB"
+        )
+
+        if not hosts:
+            embed.description = "No requests have been made yet."
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="about", description="Info about the bot.")
     async def about(self, interaction: discord.Interaction) -> None:
         """Info about the bot."""
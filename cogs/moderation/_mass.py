@@ -0,0 +1,93 @@
+# cogs/moderation/_mass.py
+import io
+import re
+from dataclasses import dataclass
+from typing import Literal
+
+import discord
+
+# User mentions and bare snowflakes.
+_USER_ID_REGEX = re.compile(r"<@!?([0-9]{15,20})>|\b([0-9]{15,20})\b")
+# Every outcome is listed in the summary embed until it runs out of room; the full list is attached.
+SUMMARY_LENGTH = 3800
+STATUS_EMOJI = {"done": ":white_check_mark:", "skipped": ":next_track:", "failed": ":x:"}
+
+
+def parse_user_ids(text: str) -> list[int]:
+    """Extract the user IDs and mentions from `text`, in order and without duplicates."""
+    ids = (int(mention or snowflake) for mention, snowflake in _USER_ID_REGEX.findall(text))
+    return list(dict.fromkeys(ids))
+
+
+@dataclass
+class Outcome:
+    user_id: int
+    status: Literal["done", "skipped", "failed"]
+    detail: str = ""
+
+    def render(self, mention: bool = True) -> str:
+        user = f"<@{self.user_id}>" if mention else str(self.user_id)
+        line = f"{STATUS_EMOJI[self.status]} {user}" if mention else f"{self.status}: {user}"
+        return f"{line} - {self.detail}" if self.detail else line
+
+
+class MassRun:
+    """The progress and outcomes of one mass moderation command, rendered for its progress message."""
+
+    def __init__(self, name: str, doing: str, done: str, user_ids: list[int]):
+        # e.g. "ban", "Banning", "Banned"
+        self.name = name
+        self.doing = doing
+        self.done = done
+        self.user_ids = user_ids
+        self.outcomes: dict[int, Outcome] = {}
+
+    def record(self, user_id: int, status: Literal["done", "skipped", "failed"], detail: str = "") -> None:
+        self.outcomes[user_id] = Outcome(user_id, status, detail)
+
+    def counts(self) -> dict[str, int]:
+        counts = dict.fromkeys(STATUS_EMOJI, 0)
+        for outcome in self.outcomes.values():
+            counts[outcome.status] += 1
+        return counts
+
+    def progress(self) -> str:
+        counts = self.counts()
+        return (
+            f":hourglass: {self.doing} {len(self.outcomes)}/{len(self.user_ids)} users... "
+            f"{counts['done']} {self.done.lower()}, {counts['skipped']} skipped, {counts['failed']} failed."
+        )
+
+    def summary(self) -> tuple[discord.Embed, discord.File | None]:
+        counts = self.counts()
+        embed = discord.Embed(
+            title=f"Mass {self.name} finished",
+            color=discord.Color.green() if not counts["failed"] else discord.Color.orange(),
+        )
+        embed.add_field(name=self.done, value=str(counts["done"]))
+        embed.add_field(name="Skipped", value=str(counts["skipped"]))
+        embed.add_field(name="Failed", value=str(counts["failed"]))
+
+        # Failures first, as they are the ones that need a moderator's attention.
+        order = {"failed": 0, "skipped": 1, "done": 2}
+        outcomes = sorted(
+            (self.outcomes.get(user_id) or Outcome(user_id, "failed", "not attempted") for user_id in self.user_ids),
+            key=lambda outcome: order[outcome.status],
+        )
+        lines = []
+        length = 0
+        truncated = False
+        for outcome in outcomes:
+            line = outcome.render()
+            if length + len(line) + 1 > SUMMARY_LENGTH:
+                truncated = True
+                lines.append(f"...and {len(outcomes) - len(lines)} more, see the attached file.")
+                break
+            lines.append(line)
+            length += len(line) + 1
+        embed.description = "\n".join(lines)
+
+        if not truncated:
+            return embed, None
+        report = "\n".join(outcome.render(mention=False) for outcome in outcomes)
+        return embed, discord.File(io.BytesIO(report.encode()), filename=f"mass-{self.name}.txt")
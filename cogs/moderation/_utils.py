@@ -24,7 +24,8 @@ def cap_timeout_duration(
     duration: Union[datetime.datetime, relativedelta],
 ) -> tuple[bool, datetime.datetime]:
     """Cap the duration of a duration to Discord's limit."""
-    now = arrow.utcnow()
+    # A plain datetime, so the capped expiry is one too and can be passed to `Member.timeout`.
+    now = arrow.utcnow().datetime
     capped = False
     if isinstance(duration, relativedelta):
         duration += now
@@ -1,7 +1,10 @@
+import asyncio
+import contextlib
 import json
 import logging
 import random
-from datetime import UTC, datetime
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
 from typing import Optional
 
 import dateutil.parser
@@ -10,9 +13,22 @@ from discord import Member, app_commands
 from discord.ext import commands
 from discord.utils import escape_markdown
 
+from utils.ratelimit import TokenBucketLimiter
+
 from . import _utils, time
+from ._mass import MassRun, parse_user_ids
 
+# Used when no duration is given. Without one, a timeout would lift the member's current timeout instead.
+TIMEOUT_DEFAULT_DURATION = "1h"
 SUPERSTARIFY_DEFAULT_DURATION = "1h"
+# The mass moderation commands act on at most MASS_ACTION_MAX_USERS users, MASS_ACTION_CONCURRENCY at a time.
+MASS_ACTION_MAX_USERS = 200
+MASS_ACTION_CONCURRENCY = 5
+# Discord doesn't publish the limits of these routes, so requests to each are paced per guild, as (burst,
+# seconds to regain one request), below what it allows. discord.py still waits out any 429 that gets through.
+MASS_ROUTE_LIMITS = {"ban": (5, 1), "kick": (5, 1), "timeout": (5, 1), "member": (10, 0.5)}
+# How often the progress message of a mass moderation command is edited.
+MASS_PROGRESS_INTERVAL = 2
 
 
 class Moderation(commands.Cog):
@@ -20,6 +36,10 @@ class Moderation(commands.Cog):
         self.bot = bot
         with open("resources/stars.json", "r") as f:
             self.superstar_names = json.load(f)
+        # Shared by every mass moderation command, so concurrent ones in a guild don't add up past the limits.
+        self.route_limits = {
+            route: TokenBucketLimiter(1 / seconds, burst) for route, (burst, seconds) in MASS_ROUTE_LIMITS.items()
+        }
 
     async def _send_moderation_dm(
         self, user: discord.Member, action: str, reason: Optional[str]
@@ -121,6 +141,7 @@ class Moderation(commands.Cog):
             )
             return
 
+        duration = duration or TIMEOUT_DEFAULT_DURATION
         duration_obj = None
         if duration:
             # Try parsing as ISO datetime first
@@ -293,7 +314,7 @@ class Moderation(commands.Cog):
     )
     @app_commands.describe(
         member="The user to superstarify",
-        duration="The duration of the nickname change (e.g., 1h, 30m). Defaults to 1 hour.",
+        duration="The duration of the nickname change (e.g., 1h, 30M). Defaults to 1 hour.",
         reason="The reason for the superstarification.",
     )
     @commands.has_permissions(moderate_members=True)
@@ -331,12 +352,13 @@ class Moderation(commands.Cog):
             )
             return
 
+        duration = duration or SUPERSTARIFY_DEFAULT_DURATION
         duration_obj = None
         if duration:
             delta = time.parse_duration_string(duration)
             if delta is None:
                 await interaction.followup.send(
-                    f"Could not parse `{duration}`. Please use a valid duration string (e.g., 1h, 30m)."
+                    f"Could not parse `{duration}`. Please use a valid duration string (e.g., 1h, 30M)."
                 )
                 return
 
@@ -403,6 +425,212 @@ class Moderation(commands.Cog):
         )
         await interaction.followup.send(embed=embed)
 
+    @staticmethod
+    def _mass_hierarchy_problem(interaction: discord.Interaction, member: discord.Member) -> str | None:
+        """Why `member` can't be acted on by the moderator who ran a mass command, if they can't."""
+        guild = interaction.guild
+        if member.id == interaction.user.id:
+            return "that's you"
+        if member.id == guild.me.id:
+            return "that's me"
+        if member.id == guild.owner_id:
+            return "they own the server"
+        if member.top_role >= guild.me.top_role:
+            return "their role is higher than or equal to mine"
+        if interaction.user.id != guild.owner_id and member.top_role >= interaction.user.top_role:
+            return "their role is higher than or equal to yours"
+        return None
+
+    async def _mass_action(
+        self,
+        interaction: discord.Interaction,
+        users: Optional[str],
+        joined_within: Optional[int],
+        labels: tuple[str, str, str],
+        route: str,
+        act: Callable[[discord.abc.Snowflake], Awaitable[None]],
+        members_only: bool = True,
+    ) -> None:
+        """
+        Run `act` on every selected user, for the mass moderation commands.
+
+        Users are selected by ID or mention, and by how recently they joined. Up to
+        MASS_ACTION_CONCURRENCY of them are acted on at a time, with the requests to Discord paced per
+        route and guild. One progress message is edited as they are done, and replaced by a summary of
+        what happened to each user at the end. `act` gets the member, or, unless `members_only`, an
+        object with the ID of a user who isn't in the server.
+        """
+        guild = interaction.guild
+        name, doing, done = labels
+
+        user_ids = parse_user_ids(users or "")
+        if joined_within is not None:
+            if not self.bot.intents.members:
+                await interaction.response.send_message(
+                    ":x: Selecting users by when they joined needs the server members intent.", ephemeral=True
+                )
+                return
+            cutoff = datetime.now(UTC) - timedelta(minutes=joined_within)
+            recent = [
+                member.id
+                for member in guild.members
+                if member.joined_at and member.joined_at >= cutoff and not member.bot
+            ]
+            user_ids = list(dict.fromkeys(user_ids + recent))
+
+        if not user_ids:
+            await interaction.response.send_message(
+                ":x: No users were selected. Give their IDs or mentions, or how many minutes ago they joined.",
+                ephemeral=True,
+            )
+            return
+        if len(user_ids) > MASS_ACTION_MAX_USERS:
+            await interaction.response.send_message(
+                f":x: {len(user_ids)} users were selected, "
+                f"but at most {MASS_ACTION_MAX_USERS} can be {done.lower()} at once.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        run = MassRun(name, doing, done, user_ids)
+        message = await interaction.followup.send(run.progress(), ephemeral=True, wait=True)
+        semaphore = asyncio.Semaphore(MASS_ACTION_CONCURRENCY)
+
+        async def act_on(user_id: int) -> None:
+            async with semaphore:
+                try:
+                    member = guild.get_member(user_id)
+                    if member is None:
+                        # Not cached, so ask Discord, to check role hierarchy before acting.
+                        await self.route_limits["member"].acquire(guild.id)
+                        with contextlib.suppress(discord.NotFound):
+                            member = await guild.fetch_member(user_id)
+
+                    if member is None and members_only:
+                        run.record(user_id, "skipped", "not in the server")
+                        return
+                    if member is not None and (problem := self._mass_hierarchy_problem(interaction, member)):
+                        run.record(user_id, "skipped", problem)
+                        return
+
+                    await self.route_limits[route].acquire(guild.id)
+                    await act(member or discord.Object(id=user_id))
+                    run.record(user_id, "done")
+                except discord.NotFound:
+                    run.record(user_id, "failed", "unknown user")
+                except discord.Forbidden:
+                    run.record(user_id, "failed", "I don't have permission")
+                except discord.HTTPException as e:
+                    run.record(user_id, "failed", e.text or f"HTTP {e.status}")
+                except Exception as e:
+                    logging.error(f"Unexpected error during mass {name} of {user_id}: {e}", exc_info=True)
+                    run.record(user_id, "failed", "unexpected error")
+
+        work = asyncio.gather(*(act_on(user_id) for user_id in user_ids))
+        while not work.done():
+            await asyncio.wait({work}, timeout=MASS_PROGRESS_INTERVAL)
+            if not work.done():
+                with contextlib.suppress(discord.HTTPException):
+                    await message.edit(content=run.progress())
+
+        counts = run.counts()
+        logging.info(
+            f"{interaction.user} ran a mass {name} in {guild.name}: "
+            f"{counts['done']} {done.lower()}, {counts['skipped']} skipped, {counts['failed']} failed."
+        )
+        embed, report = run.summary()
+        await message.edit(content=None, embed=embed, attachments=[report] if report else [])
+
+    @app_commands.command(name="mass-ban", description="Bans many users at once, e.g. during a raid")
+    @app_commands.describe(
+        users="User IDs or mentions, separated by spaces or commas",
+        joined_within="Also ban everyone who joined in the last this many minutes",
+        reason="The reason for the bans",
+        delete_message_hours="Delete the messages they sent in the last this many hours",
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def mass_ban(
+        self,
+        interaction: discord.Interaction,
+        users: Optional[str] = None,
+        joined_within: Optional[app_commands.Range[int, 1, 1440]] = None,
+        reason: Optional[str] = None,
+        delete_message_hours: app_commands.Range[int, 0, 168] = 0,
+    ) -> None:
+        """Ban many users at once. Users who already left the server are banned too."""
+
+        async def ban(user: discord.abc.Snowflake) -> None:
+            await interaction.guild.ban(user, reason=reason, delete_message_seconds=delete_message_hours * 3600)
+
+        await self._mass_action(
+            interaction, users, joined_within, ("ban", "Banning", "Banned"), "ban", ban, members_only=False
+        )
+
+    @app_commands.command(name="mass-kick", description="Kicks many users at once, e.g. during a raid")
+    @app_commands.describe(
+        users="User IDs or mentions, separated by spaces or commas",
+        joined_within="Also kick everyone who joined in the last this many minutes",
+        reason="The reason for the kicks",
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(kick_members=True)
+    async def mass_kick(
+        self,
+        interaction: discord.Interaction,
+        users: Optional[str] = None,
+        joined_within: Optional[app_commands.Range[int, 1, 1440]] = None,
+        reason: Optional[str] = None,
+    ) -> None:
+        """Kick many users at once."""
+
+        async def kick(member: discord.Member) -> None:
+            await member.kick(reason=reason)
+
+        await self._mass_action(interaction, users, joined_within, ("kick", "Kicking", "Kicked"), "kick", kick)
+
+    @app_commands.command(name="mass-timeout", description="Timeouts many users at once, e.g. during a raid")
+    @app_commands.describe(
+        users="User IDs or mentions, separated by spaces or commas",
+        joined_within="Also timeout everyone who joined in the last this many minutes",
+        duration="The duration of the timeouts (e.g., 1h, 30M). Defaults to 1 hour.",
+        reason="The reason for the timeouts",
+    )
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(moderate_members=True)
+    async def mass_timeout(
+        self,
+        interaction: discord.Interaction,
+        users: Optional[str] = None,
+        joined_within: Optional[app_commands.Range[int, 1, 1440]] = None,
+        duration: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> None:
+        """Timeout many users at once, for the same duration, which is capped to 28 days."""
+        duration = duration or TIMEOUT_DEFAULT_DURATION
+        delta = time.parse_duration_string(duration)
+        if not delta:
+            await interaction.response.send_message(
+                f"`{duration}` is not a valid duration string.", ephemeral=True
+            )
+            return
+        try:
+            expiry = datetime.now(UTC) + delta
+        except (ValueError, OverflowError):
+            await interaction.response.send_message(
+                f"`{duration}` results in a datetime outside the supported range.", ephemeral=True
+            )
+            return
+        _, expiry = _utils.cap_timeout_duration(expiry)
+
+        async def timeout(member: discord.Member) -> None:
+            await member.timeout(expiry, reason=reason)
+
+        await self._mass_action(
+            interaction, users, joined_within, ("timeout", "Timing out", "Timed out"), "timeout", timeout
+        )
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Moderation(bot))
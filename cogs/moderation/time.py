@@ -1,12 +1,53 @@
 # cogs/moderation/time.py
+import re
+from functools import lru_cache
+
 from dateutil.relativedelta import relativedelta
 
+# Each unit is optional, but they must come in descending order of magnitude, e.g. `1y2m3w4d5h6M7s`,
+# optionally separated by spaces. `m` is months and `M` is minutes.
+_DURATION_REGEX = re.compile(
+    r"((?P<years>\d+) ?(years|year|Y|y) ?)?"
+    r"((?P<months>\d+) ?(months|month|m) ?)?"
+    r"((?P<weeks>\d+) ?(weeks|week|W|w) ?)?"
+    r"((?P<days>\d+) ?(days|day|D|d) ?)?"
+    r"((?P<hours>\d+) ?(hours|hour|H|h) ?)?"
+    r"((?P<minutes>\d+) ?(minutes|minute|M) ?)?"
+    r"((?P<seconds>\d+) ?(seconds|second|S|s))?"
+)
+# Anything longer than this can't be a sensible duration, and isn't worth matching or caching.
+MAX_DURATION_LENGTH = 100
+
 
 def parse_duration_string(duration: str) -> relativedelta | None:
     """
-    Parses a duration string and returns a relativedelta object.
-    This is a placeholder and needs to be implemented.
+    Converts a `duration` string to a relativedelta object.
+
+    The function supports the following symbols for each unit of time:
+    - years: `Y`, `y`, `year`, `years`
+    - months: `m`, `month`, `months`
+    - weeks: `w`, `W`, `week`, `weeks`
+    - days: `d`, `D`, `day`, `days`
+    - hours: `H`, `h`, `hour`, `hours`
+    - minutes: `M`, `minute`, `minutes`
+    - seconds: `S`, `s`, `second`, `seconds`
+
+    The units need to be provided in descending order of magnitude.
+    Return None if the `duration` string cannot be parsed according to the symbols above.
     """
-    # Placeholder implementation, as the user did not provide the code for this.
-    # I will ask the user for the code.
-    return relativedelta(hours=1)
+    if len(duration) > MAX_DURATION_LENGTH:
+        return None
+    return _parse_duration_string(duration.strip())
+
+
+@lru_cache(maxsize=1024)
+def _parse_duration_string(duration: str) -> relativedelta | None:
+    # The result is shared between callers. That is safe because relativedelta arithmetic,
+    # including `+=`, returns new objects rather than changing the operands.
+    match = _DURATION_REGEX.fullmatch(duration)
+    # An empty string matches too, with no units at all.
+    if not match or not any(match.groupdict().values()):
+        return None
+
+    duration_dict = {unit: int(amount) for unit, amount in match.groupdict(default="0").items()}
+    return relativedelta(**duration_dict)
@@ -0,0 +1 @@
+# This file makes the xkcd directory a package.
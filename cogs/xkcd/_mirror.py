@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from pathlib import Path
+
+import aiohttp
+
+from utils.http import HTTPClient
+
+XKCD_DB = Path("data/xkcd.db")
+# How long the latest comic number is trusted before xkcd.com is asked again.
+LATEST_TTL = 5 * 60
+COLUMNS = ("num", "title", "safe_title", "alt", "img", "year", "month", "day")
+
+logger = logging.getLogger(__name__)
+
+
+def comic_url(num: int | None = None) -> str:
+    return "https://xkcd.com/info.0.json" if num is None else f"https://xkcd.com/{num}/info.0.json"
+
+
+class XkcdMirror:
+    """
+    A local SQLite copy of every xkcd comic's metadata, with a full-text index over titles and alt text.
+
+    The mirror is backfilled once, fetching missing comics with bounded concurrency, and then kept
+    up to date by `sync`, which only asks for the latest comic and fetches whatever came out since.
+    The latest comic number is trusted for `latest_ttl` seconds. After that it is asked for through
+    the shared HTTP cache, which revalidates it with a conditional request, so checking it usually
+    costs a bodiless 304 at most.
+    Reads are primary key or full-text lookups on a separate read-only connection, fast enough to
+    run on the event loop; writes happen in a thread.
+    """
+
+    def __init__(
+        self, path: Path = XKCD_DB, concurrency: int = 8, batch_size: int = 100, latest_ttl: float = LATEST_TTL
+    ):
+        self.path = path
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.latest_ttl = latest_ttl
+
+        self._writer: sqlite3.Connection | None = None
+        self._reader: sqlite3.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self.latest = 0
+        self.count = 0
+
+        self._latest_lock = asyncio.Lock()
+        self._latest_checked = float("-inf")
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = sqlite3.connect(self.path, check_same_thread=False)
+        self._writer.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS comics (
+                num INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                safe_title TEXT NOT NULL,
+                alt TEXT NOT NULL,
+                img TEXT NOT NULL,
+                year TEXT NOT NULL,
+                month TEXT NOT NULL,
+                day TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS comics_fts USING fts5(
+                title, alt, content='comics', content_rowid='num'
+            );
+            CREATE TRIGGER IF NOT EXISTS comics_fts_insert AFTER INSERT ON comics BEGIN
+                INSERT INTO comics_fts (rowid, title, alt) VALUES (new.num, new.title, new.alt);
+            END;
+            """
+        )
+        # Opened in a thread by the cog, but used on the event loop.
+        self._reader = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+        self.latest, self.count = self._reader.execute("SELECT coalesce(max(num), 0), count(*) FROM comics").fetchone()
+
+    def close(self) -> None:
+        for connection in (self._reader, self._writer):
+            if connection:
+                connection.close()
+        self._reader = self._writer = None
+
+    def get(self, num: int) -> dict | None:
+        row = self._reader.execute("SELECT * FROM comics WHERE num = ?", (num,)).fetchone()
+        return dict(row) if row else None
+
+    def random(self) -> dict | None:
+        """Pick a random mirrored comic. Numbers that don't exist, like 404, are skipped."""
+        for _ in range(5):
+            if self.latest == 0:
+                return None
+            if comic := self.get(random.randint(1, self.latest)):
+                return comic
+        return None
+
+    def search(self, query: str, limit: int = 5) -> list[dict]:
+        # Quote every term, so punctuation in the query isn't read as FTS syntax.
+        terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not terms:
+            return []
+        rows = self._reader.execute(
+            """
+            SELECT comics.* FROM comics_fts
+            JOIN comics ON comics.num = comics_fts.rowid
+            WHERE comics_fts MATCH ?
+            ORDER BY bm25(comics_fts, 10.0, 1.0)
+            LIMIT ?
+            """,
+            (terms, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    async def fetch(self, http: HTTPClient, num: int | None = None, cache: bool = False) -> dict | None:
+        """
+        Fetch a comic from xkcd.com, or the latest one. Returns None if it doesn't exist.
+
+        Old comics never change and are kept in the mirror, so only the latest goes through the HTTP cache.
+        """
+        response = await http.get(comic_url(num), cache=cache, source="xkcd")
+        if response.status == 404:
+            return None
+        response.raise_for_status()
+        info = response.json()
+        return {column: info[column] for column in COLUMNS}
+
+    async def refresh_latest(self, http: HTTPClient, force: bool = False) -> int:
+        """Return the latest comic's number, asking xkcd.com only once it is older than the TTL."""
+        if not force and self.latest and time.monotonic() - self._latest_checked < self.latest_ttl:
+            return self.latest
+
+        async with self._latest_lock:
+            # Someone else may have refreshed it while we waited.
+            if not force and self.latest and time.monotonic() - self._latest_checked < self.latest_ttl:
+                return self.latest
+
+            if (latest := await self.fetch(http, cache=True)) is not None and latest["num"] > self.latest:
+                await self.store([latest])
+            self._latest_checked = time.monotonic()
+        return self.latest
+
+    async def store(self, comics: list[dict]) -> None:
+        if not comics:
+            return
+        async with self._write_lock:
+            await asyncio.to_thread(self._write, comics)
+        self.latest = max(self.latest, *(comic["num"] for comic in comics))
+
+    def _write(self, comics: list[dict]) -> None:
+        with self._writer:
+            cursor = self._writer.executemany(
+                f"INSERT OR IGNORE INTO comics VALUES ({', '.join('?' * len(COLUMNS))})",
+                [tuple(comic[column] for column in COLUMNS) for comic in comics],
+            )
+        self.count += cursor.rowcount
+
+    def _missing(self, latest: int) -> list[int]:
+        have = {num for (num,) in self._reader.execute("SELECT num FROM comics")}
+        # There is no comic 404.
+        return [num for num in range(1, latest + 1) if num not in have and num != 404]
+
+    async def sync(self, http: HTTPClient) -> int:
+        """
+        Bring the mirror up to date and return how many comics were added.
+
+        Only the latest comic is requested when nothing is missing. Otherwise the missing comics
+        are fetched at most `concurrency` at a time and written in batches.
+        """
+        missing = self._missing(await self.refresh_latest(http, force=True))
+        if not missing:
+            return 0
+
+        logger.info(f"Mirroring {len(missing)} xkcd comics.")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_one(num: int) -> dict | None:
+            async with semaphore:
+                try:
+                    return await self.fetch(http, num)
+                except (aiohttp.ClientError, TimeoutError) as e:
+                    logger.warning(f"Failed to mirror xkcd #{num}, will retry on the next sync: {e}")
+                    return None
+
+        added = 0
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            comics = [comic for comic in await asyncio.gather(*map(fetch_one, batch)) if comic]
+            await self.store(comics)
+            added += len(comics)
+        return added
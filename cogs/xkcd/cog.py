@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from random import randint
+
+import discord
+from discord import Embed, app_commands
+from discord.ext import commands, tasks
+
+from ._mirror import XkcdMirror
+
+# How often the mirror checks xkcd.com for new comics. New comics come out three times a week.
+SYNC_INTERVAL_MINUTES = 30
+# Rendered embeds are kept for the most recently shown comics.
+EMBED_CACHE_SIZE = 256
+
+
+class Xkcd(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # Comics are served from a local copy of their metadata, kept up to date in the background.
+        self.mirror = XkcdMirror()
+        self._embeds: OrderedDict[int, dict] = OrderedDict()
+
+    async def cog_load(self) -> None:
+        await asyncio.to_thread(self.mirror.open)
+        self.sync_mirror.start()
+
+    async def cog_unload(self) -> None:
+        self.sync_mirror.cancel()
+        self.mirror.close()
+
+    @tasks.loop(minutes=SYNC_INTERVAL_MINUTES)
+    async def sync_mirror(self) -> None:
+        """Periodically mirror new xkcd comics. The first run backfills the whole archive."""
+        try:
+            if added := await self.mirror.sync(self.bot.http_client):
+                logging.info(f"Mirrored {added} xkcd comics, {self.mirror.count} in total.")
+        except Exception as e:
+            logging.error(f"Failed to sync the xkcd mirror: {e}")
+
+    async def _send(self, ctx: discord.Interaction, embed: Embed) -> None:
+        if ctx.response.is_done():
+            await ctx.followup.send(embed=embed)
+        else:
+            await ctx.response.send_message(embed=embed)
+
+    async def _send_error(self, ctx: discord.Interaction, description: str) -> None:
+        await self._send(ctx, Embed(title="Error", description=description, colour=0xCD6D6D))
+
+    def _embed(self, info: dict) -> Embed:
+        """Render a comic's embed, reusing the one rendered last time it was shown."""
+        if (cached := self._embeds.get(info["num"])) is not None:
+            self._embeds.move_to_end(info["num"])
+            return Embed.from_dict(cached)
+
+        embed = self._render(info)
+        self._embeds[info["num"]] = embed.to_dict()
+        if len(self._embeds) > EMBED_CACHE_SIZE:
+            self._embeds.popitem(last=False)
+        return embed
+
+    @staticmethod
+    def _render(info: dict) -> Embed:
+        embed = Embed(
+            title=f"XKCD comic #{info['num']}",
+            url=f"https://xkcd.com/{info['num']}",
+            colour=0x68C290,
+        )
+        embed.description = info["alt"]
+        date = f"{info['year']}/{info['month']}/{info['day']}"
+        embed.set_footer(text=f"{date} - #{info['num']}, '{info['safe_title']}'")
+
+        if info["img"].endswith(("jpg", "png", "gif")):
+            embed.set_image(url=info["img"])
+        else:
+            embed.description = (
+                "The selected comic is interactive, and cannot be displayed within an embed.\n"
+                f"Comic can be viewed [here](https://xkcd.com/{info['num']})."
+            )
+        return embed
+
+    async def _fetch_and_embed_xkcd(
+        self, ctx: discord.Interaction, xkcd_id: int | None = None
+    ):
+        """Helper function to fetch and embed an xkcd comic, from the mirror if it has it."""
+        if xkcd_id is not None:
+            num = xkcd_id
+        else:
+            try:
+                num = await self.mirror.refresh_latest(self.bot.http_client)
+            except Exception as e:
+                # Fall back to the latest comic the mirror knows about.
+                logging.warning(f"Failed to check for the latest XKCD comic: {e}")
+                num = self.mirror.latest
+
+        if num in self._embeds:
+            await self._send(ctx, self._embed({"num": num}))
+            return
+
+        info = self.mirror.get(num) if num else None
+        if info is None:
+            # Not mirrored yet, e.g. while the first backfill is still running.
+            try:
+                info = await self.mirror.fetch(self.bot.http_client, xkcd_id)
+            except Exception as e:
+                logging.error(f"An error occurred during XKCD fetch: {e}")
+                await self._send_error(ctx, f"An error occurred: {e}")
+                return
+            if info is None:
+                await self._send_error(ctx, "Could not retrieve xkcd comic.")
+                return
+            await self.mirror.store([info])
+
+        await self._send(ctx, self._embed(info))
+
+    @app_commands.command(name="xkcd-fetch", description="Fetches a specific xkcd")
+    @app_commands.describe(xkcd_id="The id of the xkcd")
+    async def xkcd_fetch(self, ctx: discord.Interaction, xkcd_id: str):
+        """Fetches a specific xkcd."""
+        if not xkcd_id.isdigit() or int(xkcd_id) < 1:
+            await self._send_error(ctx, "Could not retrieve xkcd comic.")
+            return
+        await self._fetch_and_embed_xkcd(ctx, int(xkcd_id))
+
+    @app_commands.command(name="xkcd-random", description="Fetches a random xkcd")
+    async def xkcd_random(self, ctx: discord.Interaction):
+        """Fetches a random xkcd."""
+        if (info := self.mirror.random()) is not None:
+            await self._send(ctx, self._embed(info))
+            return
+
+        # Nothing mirrored yet. The latest number is cached, so this is usually only the comic's request.
+        await ctx.response.defer()
+        try:
+            latest = await self.mirror.refresh_latest(self.bot.http_client)
+        except Exception as e:
+            logging.error(f"An error occurred during random XKCD fetch: {e}")
+            await self._send_error(ctx, f"An error occurred: {e}")
+            return
+        await self._fetch_and_embed_xkcd(ctx, randint(1, latest))
+
+    @app_commands.command(name="xkcd-latest", description="Fetches the latest xkcd")
+    async def xkcd_latest(self, ctx: discord.Interaction):
+        """Fetches the latest xkcd."""
+        await self._fetch_and_embed_xkcd(ctx)
+
+    @app_commands.command(name="xkcd-search", description="Searches xkcd titles and alt text")
+    @app_commands.describe(query="The words to search for")
+    async def xkcd_search(self, ctx: discord.Interaction, query: str):
+        """Searches xkcd titles and alt text."""
+        results = self.mirror.search(query)
+        if not results:
+            await self._send_error(ctx, f"No xkcd comics match `{query}`.")
+            return
+
+        embed = self._embed(results[0])
+        if len(results) > 1:
+            others = "\n".join(
+                f"[#{info['num']}: {info['safe_title']}](https://xkcd.com/{info['num']})" for info in results[1:]
+            )
+            embed.add_field(name="Other matches", value=others, inline=False)
+        await self._send(ctx, embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Xkcd(bot))
@@ -5,6 +5,8 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from utils.http import HTTPClient
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,7 +22,25 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 intents = discord.Intents.default()
 intents.message_content = True  # Required to read message content for commands
 intents.guilds = True  # Required for accessing guild information
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+
+class DragonBot(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Shared by every cog for outbound HTTP, so connections and DNS lookups are reused.
+        self.http_client = HTTPClient()
+
+    async def setup_hook(self) -> None:
+        # Cogs are loaded here, once the HTTP client is open, so they can use it in `cog_load`.
+        await self.http_client.start()
+        await load_cogs()
+
+    async def close(self) -> None:
+        await super().close()
+        await self.http_client.close()
+
+
+bot = DragonBot(command_prefix="!", intents=intents)
 
 
 @bot.tree.error
@@ -67,7 +87,6 @@ async def load_cogs():
 async def main():
     try:
         async with bot:
-            await load_cogs()
             await bot.start(BOT_TOKEN)
     except Exception as e:
         logging.critical(f"Bot failed to start: {e}")
@@ -0,0 +1,281 @@
+"""
+Load test for the AI cog against tools/fake_ai_proxy.py.
+
+Drives the AI cog's command callbacks with synthetic interactions from N concurrent users, then
+reports throughput, latency percentiles, event loop lag and peak RSS:
+
+    uv run tools/bench_ai.py --users 20 --requests 10 --mode stream
+
+The fake proxy is started in a subprocess, so it doesn't share the event loop being measured, unless
+`--url` points at one that is already running. Arguments after `--` are passed to the fake proxy.
+All usage, cache and image files go to a temporary directory.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.http import HTTPClient  # noqa: E402
+from utils.http_cache import HTTPCache  # noqa: E402
+
+# Replies the cog sends when a request didn't get an answer.
+ERROR_PREFIXES = (":x:", "Failed to communicate", "I couldn't", "An unexpected error")
+
+
+class FakeUser:
+    def __init__(self, id_: int):
+        self.id = id_
+
+
+class FakeGuild:
+    def __init__(self, id_: int):
+        self.id = id_
+
+
+class FakeMessage:
+    def __init__(self, interaction: "FakeInteraction", content: str | None):
+        self.interaction = interaction
+        self.content = content
+
+    async def edit(self, *, content: str | None = None, **kwargs) -> None:
+        self.interaction.record(content)
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: str | None = None, *, file=None, wait: bool = False, **kwargs):
+        if file is not None:
+            file.close()
+            self.interaction.files += 1
+        self.interaction.record(content)
+        return FakeMessage(self.interaction, content)
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs) -> None:
+        self._done = True
+
+    async def send_message(self, content: str | None = None, **kwargs) -> None:
+        self._done = True
+        self.interaction.record(content)
+
+
+class FakeInteraction:
+    """Just enough of `discord.Interaction` for the AI commands, recording what they reply."""
+
+    def __init__(self, user_id: int, guild_id: int, channel_id: int):
+        self.user = FakeUser(user_id)
+        self.guild = FakeGuild(guild_id)
+        self.channel_id = channel_id
+        self.extras: dict = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+        self.started = time.perf_counter()
+        self.first_content: float | None = None
+        self.finished = 0.0
+        self.content: str | None = None
+        self.files = 0
+
+    def record(self, content: str | None) -> None:
+        if content and not content.startswith(":hourglass:") and self.first_content is None:
+            self.first_content = time.perf_counter() - self.started
+        if content is not None:
+            self.content = content
+
+    async def edit_original_response(self, *, content: str | None = None, attachments=None, **kwargs) -> None:
+        for file in attachments or ():
+            file.close()
+            self.files += 1
+        self.record(content)
+
+    @property
+    def failed(self) -> bool:
+        if self.files:
+            return False
+        return not self.content or self.content.startswith(ERROR_PREFIXES)
+
+
+def percentile(samples: list[float], quantile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+async def measure_loop_lag(samples: list[float], interval: float = 0.01) -> None:
+    """Sample how late the event loop wakes up from a short sleep."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def wait_for_proxy(url: str, timeout: float = 15) -> None:
+    import aiohttp
+
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{url}/models") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"The fake AI proxy at {url} didn't come up.")
+            await asyncio.sleep(0.1)
+
+
+def configure(ai, args: argparse.Namespace, workdir: Path) -> None:
+    """Point the cog's files at `workdir` and lift the limits that would cut a load test short."""
+    ai.USAGE_FILE = workdir / "ai_usage.json"
+    ai.CACHE_DIR = workdir / "ai_cache" if args.disk_cache else None
+    ai.IMAGE_CACHE_DIR = workdir / "ai_images"
+    ai.DAILY_LIMIT = ai.USER_WINDOW_LIMIT = ai.GUILD_WINDOW_LIMIT = 10**9
+    ai.STREAM_RESPONSES = args.mode != "text"
+    ai.POSTPROCESS_IMAGES = args.postprocess
+    ai.HEDGE_REQUESTS = not args.no_hedge
+    if args.concurrency:
+        ai.MAX_CONCURRENT_REQUESTS = args.concurrency
+        ai.SCHEDULER_LANES = {
+            lane: (args.concurrency, max(queue, args.users)) for lane, (_, queue) in ai.SCHEDULER_LANES.items()
+        }
+
+
+async def run_user(cog, args: argparse.Namespace, user: int, results: list[FakeInteraction]) -> None:
+    for i in range(args.requests):
+        # With --repeat, some prompts are shared so caching and coalescing show up in the numbers.
+        if random.random() < args.repeat:
+            prompt = f"What is the meaning of life, question {random.randrange(10)}?"
+        else:
+            prompt = f"User {user} asks question {i}: tell me something interesting."
+
+        interaction = FakeInteraction(user, guild_id=user % args.guilds, channel_id=user)
+        mode = args.mode if args.mode != "mixed" else random.choice(("stream", "stream", "stream", "image"))
+        if mode == "image":
+            await cog.image_gen.callback(cog, interaction, prompt)
+        else:
+            await cog.ask_ai.callback(cog, interaction, prompt)
+        interaction.finished = time.perf_counter() - interaction.started
+        results.append(interaction)
+
+
+async def bench(args: argparse.Namespace, workdir: Path) -> None:
+    from cogs.ai import cog as ai
+
+    configure(ai, args, workdir)
+    await wait_for_proxy(ai.API_BASE_URL)
+
+    http_client = HTTPClient(cache=HTTPCache(workdir / "http_cache"))
+    await http_client.start()
+    cog = ai.AI(bot=SimpleNamespace(http_client=http_client))
+    await cog.cog_load()
+
+    lag: list[float] = []
+    lag_task = asyncio.create_task(measure_loop_lag(lag))
+    results: list[FakeInteraction] = []
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_user(cog, args, user, results) for user in range(args.users)))
+    finally:
+        elapsed = time.perf_counter() - started
+        lag_task.cancel()
+        await cog.cog_unload()
+        await http_client.close()
+
+    ok = [result for result in results if not result.failed]
+    latencies = [result.finished for result in ok]
+    first = [result.first_content for result in ok if result.first_content is not None]
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"Mode: {args.mode}, users: {args.users}, requests per user: {args.requests}")
+    print(f"Requests: {len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.1f}/s)")
+    print(f"Succeeded: {len(ok)}, failed: {len(results) - len(ok)}")
+    for name, samples in (("Total latency", latencies), ("First content", first)):
+        print(
+            f"{name}: p50 {percentile(samples, 0.5):.3f}s, p95 {percentile(samples, 0.95):.3f}s, "
+            f"p99 {percentile(samples, 0.99):.3f}s, max {max(samples, default=0.0):.3f}s"
+        )
+    print(
+        f"Event loop lag: p50 {percentile(lag, 0.5) * 1000:.1f}ms, p99 {percentile(lag, 0.99) * 1000:.1f}ms, "
+        f"max {max(lag, default=0.0) * 1000:.1f}ms"
+    )
+    print(f"Peak RSS: {peak_rss:.1f} MiB")
+    print(
+        f"Upstream attempts: {cog.text_upstream.attempts + cog.image_upstream.attempts}, "
+        f"retries: {cog.text_upstream.retries + cog.image_upstream.retries}, "
+        f"hedges: {cog.text_upstream.hedges + cog.image_upstream.hedges}, "
+        f"coalesced: {cog.inflight.coalesced}, cache hits: {cog.cache.hits + cog.image_cache.hits}"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> tuple[argparse.Namespace, list[str]]:
+    argv = sys.argv[1:] if argv is None else argv
+    proxy_args = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, proxy_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="Concurrent users.")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per user, one after another.")
+    parser.add_argument("--guilds", type=int, default=3, help="Servers the users are spread over.")
+    parser.add_argument("--mode", choices=("text", "stream", "image", "mixed"), default="stream")
+    parser.add_argument("--repeat", type=float, default=0.0, help="Fraction of prompts drawn from a small shared set.")
+    parser.add_argument("--concurrency", type=int, help="Override the cog's upstream concurrency limits.")
+    parser.add_argument("--disk-cache", action="store_true", help="Keep the response cache's disk tier on.")
+    parser.add_argument("--postprocess", action="store_true", help="Re-encode images with Pillow.")
+    parser.add_argument("--no-hedge", action="store_true", help="Turn off hedged requests.")
+    parser.add_argument("--url", help="Use an already running proxy at this base URL instead of starting one.")
+    parser.add_argument("--port", type=int, default=8089, help="Port for the fake proxy this starts.")
+    return parser.parse_args(argv), proxy_args
+
+
+def main() -> None:
+    args, proxy_args = parse_args()
+    proxy = None
+    if args.url:
+        url = args.url
+    else:
+        url = f"http://127.0.0.1:{args.port}/v1"
+        proxy = subprocess.Popen(
+            [sys.executable, str(ROOT / "tools" / "fake_ai_proxy.py"), "--port", str(args.port), *proxy_args]
+        )
+
+    # The cog reads these when it's imported.
+    os.environ["AI_API_URL"] = url
+    os.environ.setdefault("AI_API_KEY", "bench")
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            asyncio.run(bench(args, Path(workdir)))
+    finally:
+        if proxy:
+            proxy.terminate()
+            proxy.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Property checks and a micro-benchmark for the moderation duration parser in cogs/moderation/time.py.
+
+Generates random durations from the grammar documented in `DurationDelta`, checks that they parse
+to the expected relativedelta, and that mutated ones (units out of order, unknown or repeated
+units, missing numbers) are rejected. Then it times parsing, both with unique strings, which miss
+the memo cache, and with the handful of durations moderators actually type, which hit it:
+
+    uv run tools/bench_durations.py --cases 20000 --rounds 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dateutil.relativedelta import relativedelta  # noqa: E402
+
+from cogs.moderation.time import _parse_duration_string, parse_duration_string  # noqa: E402
+
+# In descending order of magnitude, with every spelling the grammar allows.
+UNITS = [
+    ("years", ["years", "year", "Y", "y"]),
+    ("months", ["months", "month", "m"]),
+    ("weeks", ["weeks", "week", "W", "w"]),
+    ("days", ["days", "day", "D", "d"]),
+    ("hours", ["hours", "hour", "H", "h"]),
+    ("minutes", ["minutes", "minute", "M"]),
+    ("seconds", ["seconds", "second", "S", "s"]),
+]
+COMMON = ["1h", "30M", "1d", "12h", "7d", "28d", "1w", "2h30M", "10M", "1y"]
+
+
+def valid_case(rng: random.Random) -> tuple[str, relativedelta]:
+    chosen = sorted(rng.sample(range(len(UNITS)), rng.randint(1, len(UNITS))))
+    parts, amounts = [], {}
+    for index in chosen:
+        unit, spellings = UNITS[index]
+        amounts[unit] = rng.randint(0, 10_000)
+        parts.append(f"{amounts[unit]}{rng.choice(['', ' '])}{rng.choice(spellings)}")
+    return rng.choice(["", " "]).join(parts), relativedelta(**amounts)
+
+
+def invalid_case(rng: random.Random) -> str:
+    text, _ = valid_case(rng)
+    mutation = rng.randrange(5)
+    if mutation == 0:
+        # Two different units, smallest first.
+        small, large = sorted(rng.sample(range(len(UNITS)), 2), reverse=True)
+        return f"1{UNITS[small][1][-1]}2{UNITS[large][1][-1]}"
+    if mutation == 1:
+        unit = rng.choice(UNITS)[1][-1]
+        return f"1{unit}2{unit}"
+    if mutation == 2:
+        return text + rng.choice(["x", "q", "ms", "mins", "hrs", "!"])
+    if mutation == 3:
+        return rng.choice([spellings[-1] for _, spellings in UNITS]) + text
+    return text.replace(next(c for c in text if c.isdigit()), "-", 1)
+
+
+def check(rng: random.Random, cases: int) -> None:
+    for _ in range(cases):
+        text, expected = valid_case(rng)
+        assert parse_duration_string(text) == expected, (text, parse_duration_string(text), expected)
+
+        text = invalid_case(rng)
+        assert parse_duration_string(text) is None, (text, parse_duration_string(text))
+
+    for text in ["", " ", "h", "1", "1.5h", "1 h 2", "x" * 1000, "1" * 1000 + "s"]:
+        assert parse_duration_string(text) is None, text
+    # `m` is months and `M` is minutes.
+    assert parse_duration_string("30m") == relativedelta(months=30)
+    assert parse_duration_string("30M") == relativedelta(minutes=30)
+
+
+def per_parse(texts: list[str], rounds: int, cached: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if not cached:
+            _parse_duration_string.cache_clear()
+        for text in texts:
+            parse_duration_string(text)
+    return (time.perf_counter() - started) / (rounds * len(texts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=20_000, help="random valid and invalid durations to check")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    check(rng, args.cases)
+    print(f"Checked {args.cases} valid and {args.cases} invalid durations in {time.perf_counter() - started:.2f} s.")
+
+    unique = [valid_case(rng)[0] for _ in range(args.cases)]
+    for name, texts, cached in [("unique", unique, False), ("common", COMMON * 1000, True)]:
+        seconds = per_parse(texts, args.rounds, cached)
+        print(f"{name:>8}: {seconds * 1e6:6.2f} µs per parse, {1 / seconds:>12,.0f} parses/s")
+    print(f"Cache: {_parse_duration_string.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for the message trigger matcher in cogs/fun/_triggers.py.
+
+Times matching a corpus of chat-like messages against growing trigger lists: the compiled
+matcher on a mix of whole-word and substring triggers, on only whole words and on only
+substrings, and the old approach of a linear `in` scan:
+
+    uv run tools/bench_triggers.py --counts 10 100 1000 5000
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cogs.fun._triggers import Trigger, TriggerMatcher  # noqa: E402
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+
+
+def make_messages(rng: random.Random, count: int) -> list[str]:
+    return [" ".join(random_word(rng) for _ in range(rng.randint(3, 40))) for _ in range(count)]
+
+
+def per_message(func, messages: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            func(message)
+    return (time.perf_counter() - started) / (rounds * len(messages))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--substring-share", type=float, default=0.2, help="Fraction of triggers that match inside words.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    messages = make_messages(rng, args.messages)
+
+    print(
+        f"{'triggers':>8}  {'compile':>9}  {'matcher':>10}  {'whole words':>12}  {'substrings':>11}  {'linear scan':>12}"
+    )
+    for count in args.counts:
+        words = list({random_word(rng) for _ in range(count)})
+        triggers = [Trigger(word, whole_word=rng.random() >= args.substring_share) for word in words]
+
+        started = time.perf_counter()
+        matcher = TriggerMatcher(triggers)
+        compile_time = time.perf_counter() - started
+
+        # Both must agree on whether a message triggers at all.
+        for message in messages[:200]:
+            lowered = message.casefold()
+            padded = f" {lowered} "
+            expected = any(
+                (f" {t.word} " in padded) if t.whole_word else (t.word in lowered) for t in triggers
+            )
+            assert (matcher.match(message) is not None) == expected, message
+
+        def linear(message: str) -> None:
+            lowered = message.lower()
+            for trigger in triggers:
+                if trigger.word in lowered:
+                    return
+
+        # The same number of triggers of only one kind, as the two kinds are matched differently.
+        whole_words = TriggerMatcher([Trigger(word) for word in words])
+        substrings = TriggerMatcher([Trigger(word, whole_word=False) for word in words])
+
+        compiled = per_message(matcher.match, messages, args.rounds)
+        whole = per_message(whole_words.match, messages, args.rounds)
+        inside = per_message(substrings.match, messages, args.rounds)
+        scanned = per_message(linear, messages, args.rounds)
+        print(
+            f"{len(triggers):>8}  {compile_time * 1000:>7.1f}ms  {compiled * 1e6:>8.2f}µs  {whole * 1e6:>10.2f}µs"
+            f"  {inside * 1e6:>9.2f}µs  {scanned * 1e6:>10.2f}µs"
+        )
+
+if __name__ == "__main__":
+    main()
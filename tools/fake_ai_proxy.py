@@ -0,0 +1,154 @@
+"""
+A local stand-in for the OpenAI-style AI proxy, for load testing the AI cog without spending quota.
+
+It serves `POST /v1/chat/completions` (plain, streamed and image requests) and `GET /v1/models`
+with configurable latency, token rate, error rate and image size:
+
+    uv run tools/fake_ai_proxy.py --port 8089 --latency 0.5 --error-rate 0.05
+
+Then start the bot with `AI_API_URL=http://127.0.0.1:8089/v1`, or run tools/bench_ai.py.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import random
+import struct
+import time
+import zlib
+
+from aiohttp import web
+
+WORDS = (
+    "the dragon bot answers every question with great enthusiasm and a little too much detail "
+    "because load tests deserve long answers with plenty of tokens to stream back"
+).split()
+
+
+def make_png(approx_bytes: int) -> bytes:
+    """Build a valid PNG of random noise that is roughly `approx_bytes` large."""
+    side = max(1, int((approx_bytes / 3) ** 0.5))
+    rows = b"".join(b"\x00" + os.urandom(side * 3) for _ in range(side))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeProxy:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.requests = 0
+        self.errors = 0
+        # Encoding an image on every request would make the fake the bottleneck, so a few are reused.
+        self.images = [
+            base64.b64encode(make_png(args.image_bytes)).decode("ascii") for _ in range(4)
+        ]
+
+    def _delay(self) -> float:
+        return max(0.0, random.gauss(self.args.latency, self.args.jitter))
+
+    def _answer(self) -> list[str]:
+        return [random.choice(WORDS) + " " for _ in range(self.args.tokens)]
+
+    async def models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+    async def completions(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.requests += 1
+        await asyncio.sleep(self._delay())
+
+        if random.random() < self.args.error_rate:
+            self.errors += 1
+            status = random.choice(self.args.error_statuses)
+            return web.json_response(
+                {"error": {"message": "Injected failure", "code": status}},
+                status=status,
+                headers={"Retry-After": "1"} if status == 429 else None,
+            )
+
+        model = payload.get("model", "fake")
+        if "image" in payload.get("modalities", ()):
+            return self._image(model)
+        if payload.get("stream"):
+            return await self._stream(request, model)
+
+        message = {"role": "assistant", "content": "".join(self._answer())}
+        return web.json_response(self._completion(model, message))
+
+    def _completion(self, model: str, message: dict) -> dict:
+        return {
+            "id": f"chatcmpl-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+        }
+
+    def _image(self, model: str) -> web.Response:
+        data_uri = f"data:image/png;base64,{random.choice(self.images)}"
+        message = {
+            "role": "assistant",
+            "content": "Here is your image.",
+            "images": [{"type": "image_url", "image_url": {"url": data_uri}}],
+        }
+        return web.json_response(self._completion(model, message))
+
+    async def _stream(self, request: web.Request, model: str) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": keep-alive\n\n")
+
+        for token in self._answer():
+            chunk = {
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(self.args.token_interval)
+
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def make_app(args: argparse.Namespace) -> web.Application:
+    proxy = FakeProxy(args)
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", proxy.completions)
+    app.router.add_get("/v1/models", proxy.models)
+    return app
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean seconds before a response starts.")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Standard deviation of the latency.")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens per text answer.")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="Seconds between streamed tokens.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail.")
+    parser.add_argument(
+        "--error-statuses", type=int, nargs="+", default=[429, 500, 503], help="Statuses injected failures use."
+    )
+    parser.add_argument("--image-bytes", type=int, default=1024 * 1024, help="Approximate size of generated images.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    web.run_app(make_app(args), host=args.host, port=args.port, access_log=None)
@@ -0,0 +1 @@
+# This file makes the utils directory a package.
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, tzinfo
+from pathlib import Path
+from typing import Any
+
+DAILY_CACHE_DIR = Path("data/daily")
+
+logger = logging.getLogger(__name__)
+
+
+class DailyCache:
+    """
+    Holds an "of the day" value, fetched once per day.
+
+    The day is the upstream's, in its time zone, so the value rolls over when the upstream's does,
+    daylight saving time included. The value is saved to a small JSON snapshot, so a restart during the day
+    doesn't fetch it again. Requests that arrive while it is being fetched wait for that fetch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        tz: tzinfo = UTC,
+        directory: Path = DAILY_CACHE_DIR,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.timezone = tz
+        self.path = directory / f"{name}.json"
+
+        self._day: str | None = None
+        self._value: Any = None
+        self._loaded = False
+        self._task: asyncio.Task | None = None
+        self.fetches = 0
+
+    def today(self) -> str:
+        return datetime.now(self.timezone).date().isoformat()
+
+    def is_current(self) -> bool:
+        """Whether `get` can answer from memory, without loading the snapshot or fetching."""
+        return self._day == self.today()
+
+    async def get(self) -> Any:
+        """Return today's value, fetching it if it hasn't been yet."""
+        day = self.today()
+        if self._day == day:
+            return self._value
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh(day))
+        # Shielded, so one impatient caller being cancelled doesn't cancel the fetch for everyone.
+        return await asyncio.shield(self._task)
+
+    async def _refresh(self, day: str) -> Any:
+        try:
+            if not self._loaded:
+                self._loaded = True
+                await asyncio.to_thread(self._load)
+                if self._day == day:
+                    return self._value
+
+            value = await self.fetch()
+            self.fetches += 1
+            self._day, self._value = day, value
+            await asyncio.to_thread(self._save)
+            return value
+        finally:
+            self._task = None
+
+    def _load(self) -> None:
+        try:
+            snapshot = json.loads(self.path.read_text("utf-8"))
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable {self.name} snapshot: {e}")
+            return
+        self._day, self._value = snapshot["day"], snapshot["value"]
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"day": self._day, "value": self._value}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save the {self.name} snapshot: {e}")
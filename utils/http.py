@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import aiohttp
+from yarl import URL
+
+from utils.http_cache import HTTPCache
+
+# Connections are shared by every cog; each host gets at most LIMIT_PER_HOST of them.
+CONNECTION_LIMIT = 100
+LIMIT_PER_HOST = 10
+KEEPALIVE_TIMEOUT = 60
+# Resolved addresses are reused for this many seconds instead of looking them up on every request.
+DNS_CACHE_TTL = 300
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5, sock_connect=5, sock_read=10)
+USER_AGENT = "DragonBot (+https://github.com/dragonsenseiguy/dragon-bot)"
+
+logger = logging.getLogger(__name__)
+
+
+class HostStats:
+    """Request, error and latency counters for one host."""
+
+    def __init__(self, window: int = 200):
+        self.requests = 0
+        self.errors = 0
+        self.latencies: deque[float] = deque(maxlen=window)
+
+    def percentile(self, quantile: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+@dataclass
+class Response:
+    """A GET response whose body has been read, either from the network or from the cache."""
+
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    from_cache: bool = False
+    request_info: aiohttp.RequestInfo | None = None
+    reason: str | None = None
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(self.request_info, (), status=self.status, message=self.reason or "")
+
+
+class HTTPClient:
+    """
+    The bot's one outbound HTTP session, shared by every cog.
+
+    It is opened in the bot's `setup_hook` and closed with the bot, so connections, DNS lookups and
+    TLS sessions are reused across commands. Every request is timed through a trace hook, which
+    keeps per-host request, error and latency counters; the latency is the time to the response
+    headers. Errors are failed requests and 5xx responses.
+
+    `get` goes through an on-disk cache that follows the servers' Cache-Control, ETag and
+    Last-Modified headers. A fresh response is served from disk. A stale one is revalidated with a
+    conditional request before it is used, unless the server allows serving it stale with
+    stale-while-revalidate; then it is served, and revalidated in the background. Requests for the
+    same response share one request. Endpoints that return something different every time should
+    pass `cache=False`.
+    """
+
+    def __init__(
+        self,
+        limit: int = CONNECTION_LIMIT,
+        limit_per_host: int = LIMIT_PER_HOST,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+        timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT,
+        cache: HTTPCache | None = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+
+        self._session: aiohttp.ClientSession | None = None
+        self.hosts: defaultdict[str, HostStats] = defaultdict(HostStats)
+        self.cache = cache if cache is not None else HTTPCache()
+        self._refreshes: dict[str, asyncio.Task] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("The HTTP client hasn't been started.")
+        return self._session
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.cache.load)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_exception)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT},
+            trace_configs=[trace],
+        )
+
+    async def close(self) -> None:
+        for task in self._refreshes.values():
+            task.cancel()
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def get(
+        self,
+        url: str,
+        *,
+        params: Mapping[str, str | int] | None = None,
+        headers: dict[str, str] | None = None,
+        cache: bool = True,
+        source: str | None = None,
+    ) -> Response:
+        """
+        GET `url` and read the body. Unlike `session.get`, error statuses don't raise by themselves.
+
+        Cache counters are kept per `source`, which defaults to the URL's host.
+        """
+        if params:
+            url = str(URL(url).update_query(params))
+        if not cache:
+            return await self._fetch(url, headers)
+
+        source = source or URL(url).host
+        stats = self.cache.sources[source]
+        key = self.cache.make_key(url, headers)
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_usable_stale and (body := await self.cache.read(key)) is not None:
+            if entry.is_fresh:
+                stats.hits += 1
+            else:
+                stats.stale_hits += 1
+                self._refresh(key, url, headers, source)
+            stats.bytes_saved += len(body)
+            return Response(200, entry.headers, body, from_cache=True)
+
+        return await asyncio.shield(self._refresh(key, url, headers, source))
+
+    def _refresh(self, key: str, url: str, headers: dict[str, str] | None, source: str) -> asyncio.Task:
+        """Revalidate or fetch a cached response, sharing the request with anyone already waiting on it."""
+        if (task := self._refreshes.get(key)) is None:
+            task = self._refreshes[key] = asyncio.create_task(self._revalidate(key, url, headers, source))
+            task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+            task.add_done_callback(self._log_refresh_error)
+        return task
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        # Foreground callers get the exception themselves; this is for background revalidations.
+        if not task.cancelled() and (e := task.exception()) is not None:
+            logger.info(f"Cache refresh failed: {e!r}")
+
+    async def _revalidate(self, key: str, url: str, headers: dict[str, str] | None, source: str) -> Response:
+        stats = self.cache.sources[source]
+        entry = self.cache.get(key)
+        validators = entry.validators() if entry is not None else {}
+
+        started = time.monotonic()
+        async with self.session.get(url, headers={**(headers or {}), **validators}) as response:
+            if response.status == 304 and validators:
+                body = await self.cache.read(key)
+                if body is not None and (entry := await self.cache.refresh(key, response.headers)) is not None:
+                    stats.revalidated += 1
+                    stats.bytes_saved += len(body)
+                    return Response(200, entry.headers, body, from_cache=True)
+                # The cached copy is gone; the retry below asks for the whole response.
+            else:
+                body = await response.read()
+                stats.record_miss(time.monotonic() - started)
+                if response.status == 200:
+                    await self.cache.store(key, url, response.headers, body)
+                return Response(response.status, response.headers, body, False, response.request_info, response.reason)
+
+        return await self._fetch(url, headers)
+
+    async def _fetch(self, url: str, headers: dict[str, str] | None) -> Response:
+        async with self.session.get(url, headers=headers) as response:
+            body = await response.read()
+            return Response(response.status, response.headers, body, False, response.request_info, response.reason)
+
+    async def _on_request_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestStartParams
+    ) -> None:
+        context.started = time.monotonic()
+        self.hosts[params.url.host].requests += 1
+
+    async def _on_request_end(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestEndParams
+    ) -> None:
+        stats = self.hosts[params.url.host]
+        stats.latencies.append(time.monotonic() - context.started)
+        if params.response.status >= 500:
+            stats.errors += 1
+
+    async def _on_request_exception(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestExceptionParams
+    ) -> None:
+        self.hosts[params.url.host].errors += 1
+        logger.info(f"Request to {params.url.host} failed: {params.exception!r}")
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+HTTP_CACHE_DIR = Path("data/http_cache")
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Without an explicit lifetime, a response with a Last-Modified date stays fresh for a tenth of its
+# age, as RFC 9111 suggests, but never longer than this.
+MAX_HEURISTIC_LIFETIME = 24 * 60 * 60
+# Response headers worth keeping with a cached body.
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Expires", "Date")
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    headers: dict[str, str]
+    size: int
+    stored_at: float
+    # Seconds after `stored_at` that the response is fresh, and may then be served stale.
+    max_age: float
+    stale_while_revalidate: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.age < self.max_age
+
+    @property
+    def is_usable_stale(self) -> bool:
+        return self.age < self.max_age + self.stale_while_revalidate
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if etag := self.headers.get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+
+@dataclass
+class SourceStats:
+    hits: int = 0
+    stale_hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    # Recent latencies of requests that had to fetch a body, to estimate the time hits saved.
+    miss_latencies: list[float] = field(default_factory=list)
+
+    @property
+    def average_miss_latency(self) -> float:
+        return sum(self.miss_latencies) / len(self.miss_latencies) if self.miss_latencies else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        return (self.hits + self.stale_hits) * self.average_miss_latency
+
+    def record_miss(self, latency: float) -> None:
+        self.misses += 1
+        self.miss_latencies.append(latency)
+        del self.miss_latencies[:-50]
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def freshness(headers: dict[str, str]) -> tuple[float, float] | None:
+    """
+    How long a response stays fresh and may then be served stale, or None if it mustn't be stored.
+
+    Follows Cache-Control (no-store, no-cache, max-age, stale-while-revalidate), then Expires,
+    then the Last-Modified heuristic. The time a response already spent in a shared cache, such
+    as a CDN, is taken off its lifetime, per its Age header. It is only served stale if the
+    server allows it with stale-while-revalidate.
+    """
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0, 0
+
+    stale = 0
+    if (value := directives.get("stale-while-revalidate")) and value.isdigit():
+        stale = 0 if "must-revalidate" in directives else int(value)
+    age = int(value) if (value := headers.get("Age", "")).isdigit() else 0
+
+    if (value := directives.get("max-age")) is not None and value.isdigit():
+        return max(0, int(value) - age), stale
+
+    try:
+        date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+        if "Expires" in headers:
+            return max(0.0, parsedate_to_datetime(headers["Expires"]).timestamp() - date - age), stale
+        if "Last-Modified" in headers:
+            modified_age = date - parsedate_to_datetime(headers["Last-Modified"]).timestamp()
+            return max(0.0, min(MAX_HEURISTIC_LIFETIME, modified_age / 10) - age), stale
+    except (TypeError, ValueError):
+        pass
+    # Nothing to go on: keep it only to revalidate with, if it has validators.
+    return 0, 0
+
+
+class HTTPCache:
+    """
+    An on-disk cache of GET responses, capped at `max_bytes` with least recently used eviction.
+
+    Each response is one file: a line of JSON metadata followed by the body. An index of the
+    entries is kept in memory, so deciding whether something is cached never touches the disk.
+    """
+
+    def __init__(self, directory: Path = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self._index: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.total_bytes = 0
+        self.sources: defaultdict[str, SourceStats] = defaultdict(SourceStats)
+
+    @staticmethod
+    def make_key(url: str, headers: dict[str, str] | None) -> str:
+        # Accept is the only request header our sources vary on.
+        accept = (headers or {}).get("Accept", "")
+        return hashlib.sha256(f"{url}\n{accept}".encode()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.directory.glob("*.cache"), key=lambda file: file.stat().st_mtime)
+        for file in files:
+            try:
+                with open(file, "rb") as f:
+                    entry = CacheEntry(**json.loads(f.readline()))
+            except (OSError, ValueError, TypeError):
+                file.unlink(missing_ok=True)
+                continue
+            self._index[file.stem] = entry
+            self.total_bytes += entry.size
+
+    def get(self, key: str) -> CacheEntry | None:
+        if (entry := self._index.get(key)) is not None:
+            self._index.move_to_end(key)
+        return entry
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.cache"
+
+    async def read(self, key: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread(self._read, self._path(key))
+        except OSError:
+            self._forget(key)
+            return None
+
+    @staticmethod
+    def _read(path: Path) -> bytes:
+        with open(path, "rb") as f:
+            f.readline()
+            return f.read()
+
+    async def store(self, key: str, url: str, headers: dict[str, str], body: bytes) -> None:
+        if (lifetime := freshness(headers)) is None:
+            return
+        kept = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+        if lifetime[0] == 0 and not ("ETag" in kept or "Last-Modified" in kept):
+            return  # It could never be used without fetching it again anyway.
+        if len(body) > self.max_bytes // 10:
+            return
+
+        entry = CacheEntry(url, kept, len(body), time.time(), *lifetime)
+        await asyncio.to_thread(self._write, self._path(key), entry, body)
+        self._forget(key)
+        self._index[key] = entry
+        self.total_bytes += entry.size
+        await self._evict()
+
+    async def refresh(self, key: str, headers: dict[str, str]) -> CacheEntry | None:
+        """Renew an entry after a 304, taking the new freshness headers into account."""
+        if (entry := self._index.get(key)) is None:
+            return None
+        entry.headers.update({name: headers[name] for name in KEPT_HEADERS if name in headers})
+        # Age isn't kept, as it only describes the response it came with.
+        if (lifetime := freshness({**entry.headers, "Age": headers.get("Age", "0")})) is None:
+            self._forget(key)
+            return None
+        entry.stored_at = time.time()
+        entry.max_age, entry.stale_while_revalidate = lifetime
+        await asyncio.to_thread(self._rewrite_metadata, self._path(key), entry)
+        return entry
+
+    @staticmethod
+    def _write(path: Path, entry: CacheEntry, body: bytes) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(entry.__dict__).encode() + b"\n")
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _rewrite_metadata(self, path: Path, entry: CacheEntry) -> None:
+        try:
+            body = self._read(path)
+        except OSError:
+            return
+        self._write(path, entry, body)
+
+    def _forget(self, key: str) -> None:
+        if (entry := self._index.pop(key, None)) is not None:
+            self.total_bytes -= entry.size
+
+    async def _evict(self) -> None:
+        evicted = []
+        while self.total_bytes > self.max_bytes and self._index:
+            key, entry = self._index.popitem(last=False)
+            self.total_bytes -= entry.size
+            evicted.append(self._path(key))
+        if evicted:
+            await asyncio.to_thread(lambda: [file.unlink(missing_ok=True) for file in evicted])
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchBuffer:
+    """
+    Keeps a few items from a random-content API ready to serve.
+
+    `fetch` returns a batch of one or more new items. Whenever the buffer drops below `low_water`
+    items, it is topped back up to `high_water` in the background, so commands are answered from
+    memory. Items served recently, as told apart by `key`, aren't buffered again. When the buffer
+    is empty, `get` falls back to fetching live, so a caller on a deadline should check for that
+    with `len` first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[list[Any]]],
+        low_water: int = 2,
+        high_water: int = 5,
+        key: Callable[[Any], Hashable] = lambda item: item,
+        recent_size: int = 50,
+        retry_delay: float = 30,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.low_water = low_water
+        self.high_water = high_water
+        self.key = key
+        self.retry_delay = retry_delay
+
+        self._items: deque = deque()
+        self._recent: deque[Hashable] = deque(maxlen=recent_size)
+        self._refill_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def start(self) -> None:
+        self._maybe_refill()
+
+    def close(self) -> None:
+        if self._refill_task:
+            self._refill_task.cancel()
+            self._refill_task = None
+
+    async def get(self) -> Any:
+        """Return a buffered item, or fetch one live if the buffer is empty."""
+        if self._items:
+            self.hits += 1
+            item = self._items.popleft()
+        else:
+            self.misses += 1
+            batch = await self.fetch()
+            self._add(batch[1:])
+            item = batch[0]
+
+        self._recent.append(self.key(item))
+        self._maybe_refill()
+        return item
+
+    def _add(self, batch: list[Any]) -> int:
+        seen = set(self._recent) | {self.key(item) for item in self._items}
+        added = 0
+        for item in batch:
+            if len(self._items) >= self.high_water:
+                break
+            if (key := self.key(item)) in seen:
+                continue
+            seen.add(key)
+            self._items.append(item)
+            added += 1
+        return added
+
+    def _maybe_refill(self) -> None:
+        if len(self._items) < self.low_water and self._refill_task is None:
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        try:
+            # Give up on a round after a few batches of nothing but duplicates.
+            fruitless = 0
+            while len(self._items) < self.high_water and fruitless < 3:
+                try:
+                    batch = await self.fetch()
+                except Exception as e:
+                    logger.warning(f"Prefetching {self.name} failed, retrying in {self.retry_delay}s: {e}")
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                fruitless = 0 if self._add(batch) else fruitless + 1
+        finally:
+            self._refill_task = None
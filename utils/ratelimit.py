@@ -0,0 +1,61 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class TokenBucketLimiter:
+    """
+    A token bucket per key, e.g. per channel or per user.
+
+    Each bucket holds up to `capacity` tokens and regains `rate` tokens per second. Buckets are
+    kept in least recently used order. A bucket that has been idle long enough to refill
+    completely is the same as a new one, so idle buckets are dropped as they are found, and at
+    most `max_keys` buckets are kept at once.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10_000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.refill_time = capacity / rate
+
+        # key -> (tokens, when they were counted)
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def tokens(self, key: Hashable, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        if (bucket := self._buckets.get(key)) is None:
+            return self.capacity
+        tokens, updated = bucket
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def available(self, key: Hashable) -> bool:
+        return self.tokens(key) >= 1
+
+    def try_acquire(self, key: Hashable) -> bool:
+        """Take a token from `key`'s bucket. Returns False, taking nothing, if it is empty."""
+        now = time.monotonic()
+        tokens = self.tokens(key, now)
+        if tokens < 1:
+            return False
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        self._evict(now)
+        return True
+
+    async def acquire(self, key: Hashable) -> None:
+        """Wait until `key`'s bucket has a token, then take it."""
+        while not self.try_acquire(key):
+            await asyncio.sleep((1 - self.tokens(key)) / self.rate)
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.refill_time and len(self._buckets) <= self.max_keys:
+                return
+            del self._buckets[key]